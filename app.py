@@ -1,54 +1,98 @@
 # app.py
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
 from datetime import date
+from functools import partial
 from pathlib import Path
 
 import streamlit as st
 import yaml
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 
+from src.config_store import ConfigError, get_store, main_config_store
 from src.musicalligator_client import MusicAlligatorClient
+from src.progress_events import (
+    DONE,
+    FAILED,
+    QUEUED,
+    RELEASE_STEP,
+    STARTED,
+    STEP_LABELS,
+    WARNING,
+    EventBus,
+    ProgressTracker,
+)
+from src.reference_data import (
+    REFERENCE_PATHS,
+    ReferenceDataError,
+    fetch_reference_data,
+)
+from src.release_files import (
+    DEFAULT_GROUP_PATTERN,
+    RELEASE_TYPES,
+    apply_to_selection,
+    build_rows,
+    compile_group_pattern,
+    file_set_key,
+    fill_down,
+    group_releases,
+    parse_track,
+    release_identity,
+    release_type,
+    settings_from_rows,
+)
+from src.startup import StartupTimer, profiling_enabled
 
-try:
-    from streamlit.runtime.scriptrunner import add_script_run_ctx
-except Exception:  # streamlit<1.25
-    add_script_run_ctx = None
-import re
-import threading
+timer = StartupTimer()
 
 # —————————————
 # Config load & save
 # —————————————
 CONFIG_PATH = Path("config.yaml")
+# Measured upload speed, used by the dry-run estimate
+STATS_PATH = Path("upload_stats.yaml")
+# Switch to the single-table editor when there are more releases than this
+BATCH_MODE_THRESHOLD = 20
+# Seconds between redraws of the upload progress
+PROGRESS_REFRESH = 0.5
+# Concurrent WAV uploads inside one multi-track release
+TRACK_UPLOAD_WORKERS = 4
+# Seconds between redraws of the watch mode status
+WATCH_REFRESH = 2.0
+# Seconds to keep artists/labels/persons/platforms before fetching them again
+REFERENCE_TTL = 600
+# Seconds before fetching reference lists again after a failure
+REFERENCE_RETRY = 30
+
+
+config_store = main_config_store(CONFIG_PATH)
+stats_store = get_store(STATS_PATH)
+try:
+    config = config_store.load()
+except ConfigError as exc:
+    st.error("Ошибка в config.yaml:\n\n" + "\n".join(f"- {p}" for p in exc.problems))
+    st.stop()
 
 
-def load_config():
-    if CONFIG_PATH.exists():
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    return {
-        "auth_token": "",
-        "artists": {},
-        "labels": {},
-        "presets": {},
-        "streaming_platforms": [195, 196, 197],
-    }
-
+def save_stats(meter):
+    stats_store.save(meter.to_dict())
 
-def save_config(cfg):
-    with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-        yaml.safe_dump(cfg, f)
 
+@st.cache_resource
+def get_meter():
+    """Process-wide throughput meter, seeded from the last measurements."""
+    from src.planner import ThroughputMeter  # only needed for uploads and plans
 
-config = load_config()
+    try:
+        return ThroughputMeter.from_dict(stats_store.load())
+    except ConfigError:
+        return ThroughputMeter()
 
 
-# Helper to attach Streamlit context to worker threads
-def run_with_ctx(fn, *args, **kwargs):
-    if add_script_run_ctx:
-        add_script_run_ctx(threading.current_thread())
-    return fn(*args, **kwargs)
+timer.mark("конфиг")
 
 
 # —————————————
@@ -60,8 +104,8 @@ config["auth_token"] = st.sidebar.text_input(
     "Токен", config.get("auth_token", ""), type="password", key="token_input"
 ).strip()
 
-if config["auth_token"] and not CONFIG_PATH.exists():
-    save_config(config)
+if config["auth_token"] and not config_store.exists():
+    config_store.save(config)
     st.sidebar.success("Конфигурация создана")
 
 
@@ -70,34 +114,55 @@ client = MusicAlligatorClient(config["auth_token"])
 session = client.session
 
 
-@st.cache_data(show_spinner=False)
-def load_persons():
-    """Return mapping of name -> id for known persons."""
+@st.cache_data(ttl=REFERENCE_TTL, show_spinner="Загрузка справочников…")
+def load_reference_data(token):
+    """Fetch artists, labels, persons and platforms in parallel, once per token.
+
+    Raises :class:`ReferenceDataError` when a list fails, so that partial
+    results are not cached.
+    """
+    data, failed = fetch_reference_data(MusicAlligatorClient(token))
+    if failed:
+        raise ReferenceDataError(data, failed)
+    return data
+
+
+def get_reference_data(token):
+    """Cached reference data; after a failure retry at most every few seconds.
+
+    The partial result of a failed fetch is kept in this session only.
+    """
+    if not token:
+        return {kind: {} for kind in REFERENCE_PATHS}, []
+    retry = st.session_state.get("reference_retry")
+    if retry and retry["token"] == token and time.monotonic() < retry["at"]:
+        return retry["data"], retry["failed"]
     try:
-        r = client.get("/persons?name=")
-        if r.status_code == 200:
-            return {p["name"]: p["id"] for p in r.json().get("data", [])}
-    except Exception:
-        pass
-    return {}
+        data = load_reference_data(token)
+    except ReferenceDataError as exc:
+        st.session_state.reference_retry = {
+            "token": token,
+            "at": time.monotonic() + REFERENCE_RETRY,
+            "data": exc.data,
+            "failed": exc.failed,
+        }
+        return exc.data, exc.failed
+    st.session_state.pop("reference_retry", None)
+    return data, []
 
 
-# Fetch artists & labels
-try:
-    art = client.get("/artists?name=").json().get("data", [])
-    artist_map = {a["name"]: a["id"] for a in art}
-except:
-    artist_map = {}
-try:
-    lbl = (
-        client.get("/labels?_status=READY&level=REGULAR&skip=0&limit=100")
-        .json()
-        .get("data", {})
-        .get("data", [])
+# Fetch artists, labels, persons & streaming platforms
+references, failed_references = get_reference_data(config["auth_token"])
+if failed_references:
+    st.sidebar.warning(
+        f"Не удалось загрузить: {', '.join(failed_references)}. "
+        f"Повтор через {REFERENCE_RETRY} с"
     )
-    label_map = {l["name"]: l["id"] for l in lbl}
-except:
-    label_map = {}
+artist_map = references["artists"]
+label_map = references["labels"]
+persons = references["persons"]
+platform_map = references["platforms"]
+timer.mark("справочники")
 
 config.setdefault("artists", {})
 selected_artists = st.sidebar.multiselect(
@@ -159,7 +224,6 @@ for artist_name in config["artists"]:
         step=1,
         key=f"lang_{artist_name}",
     )
-    persons = load_persons()
     person_names = list(persons.keys())
     comp_default = [
         next((n for n, pid in persons.items() if pid == cid), str(cid))
@@ -186,12 +250,18 @@ for artist_name in config["artists"]:
 config["presets"] = presets_ui
 
 if st.sidebar.button("Сохранить конфиг", key="save_config"):
-    save_config(config)
-    st.sidebar.success("Конфигурация сохранена")
+    try:
+        if config_store.save(config):
+            st.sidebar.success("Конфигурация сохранена")
+        else:
+            st.sidebar.info("Изменений нет")
+    except ConfigError as exc:
+        st.sidebar.error("; ".join(exc.problems))
 
 max_workers = st.sidebar.number_input(
     "Параллельные загрузки", min_value=1, max_value=5, value=1, step=1, key="workers"
 )
+timer.mark("боковая панель")
 
 # —————————————
 # Main UI
@@ -210,39 +280,221 @@ for f in covers:
 for f in wavs:
     groups.setdefault(Path(f.name).stem, {})["audio"] = f
 
-st.write("Найденные релизы:")
-
-found = []
-for base, files in groups.items():
-    title_part = base.split(" - ", 1)[1] if " - " in base else base
-    ver = ""
-    m = re.search(r"\(([^()]*)\)\s*$", title_part)
-    if m:
-        ver = m.group(1).strip()
-        title_part = title_part[: m.start()].rstrip()
-    found.append(
-        {
-            "Файл": base,
-            "Артист": base.split(" - ", 1)[0] if " - " in base else "",
-            "Название": title_part,
-            "Версия": ver,
-            "Обложка": "✅" if "cover" in files else "⚠️",
-            "Аудио": "✅" if "audio" in files else "⚠️",
-        }
+
+@st.cache_data(show_spinner=False)
+def parse_file_set(file_set: tuple, pattern: str, today: date) -> list[dict]:
+    """Parse file names once per uploaded file set.
+
+    ``today`` is part of the cache key so the default track date does not
+    go stale after midnight.
+    """
+    regex = compile_group_pattern(pattern) if pattern else None
+    return build_rows(file_set, today, regex)
+
+
+@st.cache_data(show_spinner=False)
+def check_manifest(data: bytes, filename: str, file_set: tuple, references: dict):
+    """Parse and validate a manifest without touching the API."""
+    from src.manifest import (  # only needed once a manifest is uploaded
+        ManifestError,
+        References,
+        load_manifest,
+        validate_manifest,
     )
-st.table(found)
 
-track_settings = {}
-for base, files in groups.items():
-    artist = base.split(" - ", 1)[0] if " - " in base else base
-    with st.expander(base, expanded=False):
-        p_exp = st.checkbox("Ненормативная лексика", value=False, key=f"ex_{base}")
-        p_date = st.date_input("Дата трека", value=date.today(), key=f"td_{base}")
-    track_settings[base] = {"explicit": p_exp, "track_date": p_date.isoformat()}
+    available = {
+        base: {"audio": True} if has_audio else {}
+        for base, _has_cover, has_audio in file_set
+    }
+    try:
+        raw = load_manifest(data, filename)
+    except (ValueError, yaml.YAMLError) as exc:
+        return [], [ManifestError(0, "", f"Не удалось прочитать манифест: {exc}")]
+    return validate_manifest(raw, References(**references), available)
+
 
+manifest_file = st.file_uploader(
+    "Манифест (CSV/YAML, необязательно)",
+    type=["csv", "yaml", "yml"],
+    key="manifest_file",
+    help="Колонки описаны в README, раздел «Манифест»; обязательна только `file`",
+)
+manifest_errors = []
+if manifest_file is not None:
+    manifest_refs = {
+        "artists": {
+            n: i for n, i in config["artists"].items() if n in config["presets"]
+        },
+        "labels": config.get("labels", {}),
+        "persons": persons,
+        # IDs already used in the config stay valid if the list can't be fetched
+        "platforms": {
+            **{str(p): p for p in config.get("streaming_platforms", [])},
+            **platform_map,
+        },
+    }
+    manifest_rows, manifest_errors = check_manifest(
+        manifest_file.getvalue(),
+        manifest_file.name,
+        file_set_key(groups),
+        manifest_refs,
+    )
+    if manifest_errors:
+        st.error(f"Ошибок в манифесте: {len(manifest_errors)}. Загрузка недоступна.")
+        st.dataframe(
+            [e.to_dict() for e in manifest_errors],
+            hide_index=True,
+            use_container_width=True,
+        )
+        releases, track_settings = {}, {}
+    else:
+        from src.manifest import manifest_releases
+
+        releases, track_settings = manifest_releases(manifest_rows, groups)
+        st.success(
+            f"Манифест проверен: {len(manifest_rows)} треков, {len(releases)} релизов"
+        )
+        st.dataframe(
+            [{k: v for k, v in r.items() if k != "artist_id"} for r in manifest_rows],
+            hide_index=True,
+            use_container_width=True,
+        )
+else:
+    group_by_pattern = st.checkbox(
+        "Собирать EP/альбомы по шаблону имени",
+        value=bool(config.get("group_pattern")),
+        key="group_by_pattern",
+        help="Файлы с одинаковой группой release попадают в один релиз",
+    )
+    group_pattern = ""
+    group_regex = None
+    if group_by_pattern:
+        group_pattern = st.text_input(
+            "Шаблон (регулярное выражение)",
+            config.get("group_pattern") or DEFAULT_GROUP_PATTERN,
+            key="group_pattern",
+        )
+        try:
+            group_regex = compile_group_pattern(group_pattern)
+            config["group_pattern"] = group_pattern
+        except ValueError as exc:
+            st.error(str(exc))
+            group_pattern = ""
+
+    releases = group_releases(groups, group_regex)
+    # The track count only suggests the type; e.g. a 10-track EP is allowed
+    for rel_name, rel in releases.items():
+        if len(rel["tracks"]) < 2:
+            continue
+        auto = release_type(len(rel["tracks"]))
+        chosen = st.selectbox(
+            f"Тип релиза: {rel_name}",
+            [""] + RELEASE_TYPES,
+            format_func=lambda t, auto=auto: t or f"Авто ({auto})",
+            key=f"rtype_{rel_name}",
+        )
+        if chosen:
+            rel.setdefault("options", {})["release_type"] = chosen
+
+    st.write("Найденные релизы:")
+
+    file_set = file_set_key(groups)
+    rows = parse_file_set(file_set, group_pattern, date.today())
+
+    batch_mode = st.toggle(
+        "Пакетный режим",
+        value=len(groups) > BATCH_MODE_THRESHOLD,
+        key="batch_mode",
+        help="Все параметры треков в одной таблице",
+    )
+
+    track_settings = {}
+    if batch_mode and rows:
+        import pandas as pd  # only needed for the batch table
+
+        # Keep the edited table across reruns until the uploaded files change
+        if st.session_state.get("batch_file_set") != (file_set, group_pattern):
+            st.session_state.batch_file_set = (file_set, group_pattern)
+            st.session_state.batch_rows = [dict(r) for r in rows]
+            st.session_state.batch_version = 0
+        edited = st.data_editor(
+            pd.DataFrame(st.session_state.batch_rows),
+            use_container_width=True,
+            hide_index=True,
+            disabled=["Файл", "Релиз", "Обложка", "Аудио"],
+            column_config={
+                "explicit": st.column_config.CheckboxColumn("Ненормативная лексика"),
+                "track_date": st.column_config.DateColumn(
+                    "Дата трека", format="YYYY-MM-DD"
+                ),
+                "select": st.column_config.CheckboxColumn("Выбрать"),
+            },
+            key=f"batch_table_{st.session_state.batch_version}",
+        )
+        edited_rows = edited.to_dict("records")
 
-def batch_update_tracks(release_id, track_list, sess):
-    st.write("→ Обновление метаданных трека…")
+        bulk = st.columns(4)
+        bulk_explicit = bulk[0].checkbox("Ненормативная лексика", key="bulk_explicit")
+        bulk_date = bulk[1].date_input(
+            "Дата трека", value=date.today(), key="bulk_date"
+        )
+        apply_clicked = bulk[2].button("Применить к выбранным", key="bulk_apply")
+        fill_clicked = bulk[3].button("Заполнить вниз", key="bulk_fill")
+        if apply_clicked or fill_clicked:
+            if apply_clicked:
+                apply_to_selection(
+                    edited_rows, {"explicit": bulk_explicit, "track_date": bulk_date}
+                )
+            else:
+                fill_down(edited_rows)
+            st.session_state.batch_rows = edited_rows
+            # A new editor key drops the old edits that are now part of the rows
+            st.session_state.batch_version += 1
+            st.rerun()
+        track_settings = settings_from_rows(edited_rows)
+    else:
+        st.table(
+            [
+                {
+                    k: v
+                    for k, v in r.items()
+                    if k not in ("explicit", "track_date", "select")
+                }
+                for r in rows
+            ]
+        )
+        for row in rows:
+            base = row["Файл"]
+            with st.expander(base, expanded=False):
+                p_exp = st.checkbox(
+                    "Ненормативная лексика", value=False, key=f"ex_{base}"
+                )
+                p_date = st.date_input(
+                    "Дата трека", value=date.today(), key=f"td_{base}"
+                )
+            track_settings[base] = {
+                "artist": row["Артист"],
+                "title": row["Название"],
+                "version": row["Версия"],
+                "explicit": p_exp,
+                "track_date": p_date.isoformat(),
+            }
+
+
+def report_response(emit, step, r, ok_codes=None):
+    """Emit DONE or FAILED for ``step`` depending on the response code."""
+    get_meter().record_response(r)
+    ok = r.status_code in ok_codes if ok_codes else r.status_code < 400
+    if ok:
+        emit(step, DONE, f"HTTP {r.status_code}")
+    else:
+        emit(step, FAILED, f"HTTP {r.status_code}: {r.text}")
+    return ok
+
+
+def batch_update_tracks(release_id, track_list, sess, emit):
+    emit("tracks", STARTED)
+    failed = []
     for meta in track_list:
         tid = meta.get("trackId")
         data = {k: v for k, v in meta.items() if k != "trackId"}
@@ -250,9 +502,13 @@ def batch_update_tracks(release_id, track_list, sess):
             f"https://v2api.musicalligator.com/api/releases/{release_id}/tracks/{tid}",
             json=data,
         )
-        st.write(f"Обновление трека {tid}: {r.status_code}")
+        get_meter().record_response(r)
         if r.status_code >= 400:
-            st.write(r.text)
+            failed.append(f"{tid}: HTTP {r.status_code}: {r.text}")
+    if failed:
+        emit("tracks", FAILED, "; ".join(failed))
+    else:
+        emit("tracks", DONE, f"{len(track_list)} шт.")
 
 
 def get_label_name(label_id: int) -> str:
@@ -262,7 +518,7 @@ def get_label_name(label_id: int) -> str:
     return ""
 
 
-def set_release_label(release_id: int, label_id: int, year: int, sess):
+def set_release_label(release_id: int, label_id: int, year: int, sess, emit):
     label = get_label_name(label_id)
     data = {
         "labelId": label_id,
@@ -271,173 +527,469 @@ def set_release_label(release_id: int, label_id: int, year: int, sess):
         "clineYear": str(year),
         "plineYear": str(year),
     }
-    st.write("→ Установка лейбла…")
+    emit("label", STARTED, release_id=release_id)
     r = sess.put(
         f"https://v2api.musicalligator.com/api/releases/{release_id}",
         json=data,
     )
-    st.write(f"Ответ на изменение лейбла: {r.status_code}")
-    if r.status_code >= 400:
-        st.write(r.text)
+    report_response(emit, "label", r)
 
 
-def set_streaming_platforms(release_id: int, platforms: list[int], sess):
+def set_streaming_platforms(release_id: int, platforms: list[int], sess, emit):
     data = {"streamingPlatforms": platforms}
-    st.write("→ Установка площадок…")
+    emit("platforms", STARTED, release_id=release_id)
     r = sess.put(
         f"https://v2api.musicalligator.com/api/releases/{release_id}",
         json=data,
     )
-    st.write(f"Ответ на изменение площадок: {r.status_code}")
-    if r.status_code >= 400:
-        st.write(r.text)
+    report_response(emit, "platforms", r)
+
+
+def add_release_track(release_id, sess, emit, track):
+    """Append an empty track to the release and return its id."""
+    emit("add_track", STARTED, track=track)
+    r = sess.post(f"https://v2api.musicalligator.com/api/releases/{release_id}/tracks")
+    if not report_response(partial(emit, track=track), "add_track", r, (200, 201)):
+        return None
+    return r.json()["data"]["trackId"]
+
+
+def upload_track_audio(release_id, track_id, audio, emit, track):
+    """Upload one WAV; runs in its own thread with its own session."""
+    sess = client.clone_session()
+    emit("audio", STARTED, track=track)
+    r = sess.post(
+        f"https://v2api.musicalligator.com/api/releases/{release_id}/tracks/{track_id}/upload",
+        files={"file": (Path(audio.name).name, audio, "audio/wav")},
+    )
+    return report_response(partial(emit, track=track), "audio", r, (200, 201))
+
 
+def upload_release(name, release, settings, bus):
+    """Create and fill one release, reporting progress through ``bus``.
 
-def upload_release(base, files, opts):
+    ``release`` is an entry of :func:`group_releases` (or
+    :func:`manifest_releases`, whose ``options`` override the preset);
+    ``settings`` maps track stems to their options. Runs in a worker
+    thread, so it must not call Streamlit directly. Returns the id of the
+    created release, or ``None`` if no draft was created.
+    """
+    emit = partial(bus.emit, name)
     local = client.clone_session()
-    artist, title = (base.split(" - ", 1) + [""])[:2]
-    version = ""
-    m = re.search(r"\(([^()]*)\)\s*$", title)
-    if m:
-        version = m.group(1).strip()
-        title = title[: m.start()].rstrip()
+    tracks = release["tracks"]
+    ropts = release.get("options", {})
+    first = settings.get(tracks[0]["stem"], {})
+    artist, title, version = release_identity(name, release, settings)
+    emit(RELEASE_STEP, STARTED)
     if artist not in config["artists"]:
-        st.error(f"Нет artist_id для '{artist}'")
-        return
+        emit(RELEASE_STEP, FAILED, f"Нет artist_id для '{artist}'")
+        return None
     preset = config["presets"][artist]
-    main_genre = preset.get("genre_id")
+    main_genre = ropts.get("genre_id") or preset.get("genre_id")
     artist_id = config["artists"][artist]
 
     # 1) Создать черновик
-    st.write(f"→ Создание черновика для '{title}'…")
+    emit("create", STARTED, title)
     r1 = local.post(
         "https://v2api.musicalligator.com/api/releases/create",
-        json={"releaseType": "SINGLE"},
+        json={"releaseType": release_type(len(tracks), ropts.get("release_type"))},
     )
-    if r1.status_code != 201:
-        st.error(f"Ошибка создания: {r1.status_code} {r1.text}")
-        return
+    if not report_response(emit, "create", r1, (201,)):
+        emit(RELEASE_STEP, FAILED, "Ошибка создания черновика")
+        return None
     rid = r1.json()["data"]["release"]["releaseId"]
-    st.write(f"Черновик {rid} создан")
+    emit = partial(emit, release_id=rid)
+
+    # 1a) Добавить остальные треки
+    track_ids = [r1.json()["data"]["release"]["tracks"][0]["trackId"]]
+    for t in tracks[1:]:
+        tid = add_release_track(rid, local, emit, t["stem"])
+        if tid is None:
+            emit(RELEASE_STEP, FAILED, "Не удалось добавить трек")
+            return rid
+        track_ids.append(tid)
 
     # 2) Обновить базовые метаданные релиза
-    track0 = r1.json()["data"]["release"]["tracks"][0]["trackId"]
-    track_date = opts.get("track_date", date.today().isoformat())
-    track_list = []
+    release_date = ropts.get("release_date") or first.get(
+        "track_date", date.today().isoformat()
+    )
     meta_release = {
         "title": title,
-        "releaseDate": track_date,
-        "originalReleaseDate": track_date,
+        "releaseDate": release_date,
+        "originalReleaseDate": release_date,
         "status": "DRAFT",
         "client": {"id": artist_id},
         "artists": [{"id": artist_id, "role": "MAIN"}],
         "genre": {"genreId": main_genre},
-        "tracks": [{"trackId": track0}],
+        "tracks": [{"trackId": tid} for tid in track_ids],
         "countries": [],
     }
     if version:
         meta_release["releaseVersion"] = version
+    emit("metadata", STARTED)
     r2 = local.put(
         f"https://v2api.musicalligator.com/api/releases/{rid}", json=meta_release
     )
-    st.write(f"Метаданные обновлены: {r2.status_code}")
-    if r2.status_code >= 400:
-        st.write(r2.text)
+    report_response(emit, "metadata", r2)
 
     # 2a) Установить лейбл
-    label_id = preset.get("label_id")
+    label_id = ropts.get("label_id") or preset.get("label_id")
     if label_id:
-        year = date.fromisoformat(track_date).year
-        set_release_label(rid, label_id, year, local)
+        year = date.fromisoformat(release_date).year
+        set_release_label(rid, label_id, year, local, emit)
 
     # 3) Upload cover
-    if "cover" in files:
-        st.write("→ Загрузка обложки…")
+    if release.get("cover") is not None:
+        cover = release["cover"]
+        emit("cover", STARTED)
         r3 = local.post(
             f"https://v2api.musicalligator.com/api/releases/{rid}/cover",
-            files={"file": (files["cover"].name, files["cover"], "image/png")},
-        )
-        st.write(f"Ответ загрузки обложки: {r3.status_code}")
-        if r3.status_code >= 400:
-            st.write(r3.text)
-
-    # 4) Upload audio на правильный endpoint
-    if "audio" in files:
-        st.write("→ Загрузка аудио…")
-        fa = files["audio"]
-        r4 = local.post(
-            f"https://v2api.musicalligator.com/api/releases/{rid}/tracks/{track0}/upload",
-            files={"file": (fa.name, fa, "audio/wav")},
+            files={"file": (Path(cover.name).name, cover, "image/png")},
         )
-        st.write(f"Ответ загрузки аудио: {r4.status_code}")
-        if r4.status_code not in (200, 201):
-            st.error("Не удалось загрузить аудио")
-            st.write(r4.text)
-            return
-
-        # 5) Обновить метаданные трека
-        if not preset.get("composers") or not preset.get("lyricists"):
-            st.warning(f"Отсутствуют композиторы/авторы текста для {artist}")
-        st.write("→ Подготовка метаданных трека…")
-        persons = [{"id": c, "role": "MUSIC_AUTHOR"} for c in preset["composers"]] + [
-            {"id": l, "role": "LYRICS_AUTHOR"} for l in preset["lyricists"]
+        report_response(emit, "cover", r3)
+
+    # 4) Upload audio всех треков параллельно
+    with_audio = [(t, tid) for t, tid in zip(tracks, track_ids) if t.get("audio")]
+    uploaded = []
+    if with_audio:
+        with ThreadPoolExecutor(
+            max_workers=min(TRACK_UPLOAD_WORKERS, len(with_audio))
+        ) as exe:
+            futures = [
+                exe.submit(upload_track_audio, rid, tid, t["audio"], emit, t["stem"])
+                for t, tid in with_audio
+            ]
+            uploaded = [item for item, f in zip(with_audio, futures) if f.result()]
+        if not uploaded:
+            emit(RELEASE_STEP, FAILED, "Не удалось загрузить аудио")
+            return rid
+
+    # 5) Обновить метаданные всех треков за один проход
+    track_list = []
+    for t, tid in uploaded:
+        opts = settings.get(t["stem"], {})
+        composers = opts.get("composers") or preset.get("composers", [])
+        lyricists = opts.get("lyricists") or preset.get("lyricists", [])
+        if not composers or not lyricists:
+            emit(
+                "tracks",
+                WARNING,
+                f"Отсутствуют композиторы/авторы текста для {artist}",
+                track=t["stem"],
+            )
+        persons = [{"id": c, "role": "MUSIC_AUTHOR"} for c in composers] + [
+            {"id": l, "role": "LYRICS_AUTHOR"} for l in lyricists
         ]
+        t_artist, t_title, t_version = parse_track(t["stem"], name)
+        t_artist = opts.get("artist", t_artist)
+        t_artist_id = config["artists"].get(t_artist, artist_id)
+        t_version = opts.get("version", t_version)
         track_meta = {
-            "trackId": track0,
-            "artist": artist_id,
-            "artists": [{"id": artist_id, "role": "MAIN"}],
-            "title": title,
-            "trackVersion": version if version else None,
-            "genre": {"genreId": main_genre},
+            "trackId": tid,
+            "artist": t_artist_id,
+            "artists": [{"id": t_artist_id, "role": "MAIN"}],
+            "title": opts.get("title", t_title),
+            "trackVersion": t_version if t_version else None,
+            "genre": {"genreId": opts.get("genre_id") or main_genre},
             "recordingYear": preset["recording_year"],
             "language": preset["language_id"],
-            "composers": preset["composers"],
-            "lyricists": preset["lyricists"],
+            "composers": composers,
+            "lyricists": lyricists,
             "persons": persons,
             "adult": opts.get("explicit", False),
             "trackDate": opts.get("track_date"),
         }
         if track_meta["trackVersion"] is None:
             del track_meta["trackVersion"]
-
         track_list.append(track_meta)
-
     if track_list:
-        batch_update_tracks(rid, track_list, local)
+        batch_update_tracks(rid, track_list, local, emit)
 
     set_streaming_platforms(
         rid,
-        config.get("streaming_platforms", [195, 196, 197]),
+        ropts.get("platforms") or config.get("streaming_platforms", [195, 196, 197]),
         local,
+        emit,
     )
 
-    st.success(f"Релиз {rid} готов!")
-    st.markdown(f"[Открыть релиз](https://app.musicalligator.ru/releases/{rid})")
+    if len(uploaded) < len(with_audio):
+        missing = len(with_audio) - len(uploaded)
+        emit(RELEASE_STEP, FAILED, f"Не загружено аудио для {missing} трек(ов)")
+    else:
+        emit(RELEASE_STEP, DONE, f"https://app.musicalligator.ru/releases/{rid}")
+    return rid
+
+
+def upload_local_release(name, release, settings, bus):
+    """Upload a release from files on disk (used by the watch mode)."""
+    with ExitStack() as stack:
+        opened = {
+            "cover": (
+                stack.enter_context(open(release["cover"], "rb"))
+                if release.get("cover")
+                else None
+            ),
+            "tracks": [
+                {
+                    "stem": t["stem"],
+                    "audio": stack.enter_context(open(t["audio"], "rb")),
+                }
+                for t in release["tracks"]
+            ],
+        }
+        return upload_release(name, opened, settings, bus)
+
+
+def render_progress(tracker, total, widgets):
+    """Redraw the progress widgets from the tracker state."""
+    widgets["progress"].progress(tracker.finished / total if total else 1.0)
+    widgets["status"].dataframe(
+        tracker.status_rows(),
+        hide_index=True,
+        use_container_width=True,
+        column_config={"Сообщение": st.column_config.TextColumn(width="large")},
+    )
+    widgets["in_flight"].dataframe(
+        tracker.in_flight_rows(), hide_index=True, use_container_width=True
+    )
+    if tracker.errors:
+        with widgets["errors"].container():
+            with st.expander(f"Журнал ошибок ({len(tracker.errors)})"):
+                st.code("\n".join(ev.format() for ev in tracker.errors))
 
 
 def run_all_uploads():
-    total = len(groups)
-    progress = st.progress(0.0)
-    done = 0
-    futures = []
+    total = len(releases)
+    bus = EventBus()
+    tracker = ProgressTracker(list(releases))
+    widgets = {
+        "progress": st.progress(0.0),
+        "status": st.empty(),
+        "in_flight": st.empty(),
+        "errors": st.empty(),
+    }
+    futures = {}
+    started = time.monotonic()
     with ThreadPoolExecutor(max_workers=max_workers) as exe:
-        for base, files in groups.items():
-            opts = track_settings.get(base, {})
-            futures.append(exe.submit(run_with_ctx, upload_release, base, files, opts))
-        for _ in as_completed(futures):
-            done += 1
-            progress.progress(done / total)
+        for name, release in releases.items():
+            futures[exe.submit(upload_release, name, release, track_settings, bus)] = (
+                name
+            )
+        pending = set(futures)
+        while pending:
+            finished, pending = wait(
+                pending, timeout=PROGRESS_REFRESH, return_when=FIRST_COMPLETED
+            )
+            for fut in finished:
+                exc = fut.exception()
+                if exc is not None:
+                    bus.emit(futures[fut], RELEASE_STEP, FAILED, repr(exc))
+            tracker.apply(bus.drain())
+            render_progress(tracker, total, widgets)
+    tracker.apply(bus.drain())
+    render_progress(tracker, total, widgets)
+    # Parallel uploads share one link, remember what the whole run achieved
+    from src.planner import file_size
+
+    meter = get_meter()
+    sent = sum(
+        file_size(r.get("cover")) + sum(file_size(t.get("audio")) for t in r["tracks"])
+        for r in releases.values()
+    )
+    meter.record_run(sent, time.monotonic() - started)
+    save_stats(meter)
     st.balloons()
     st.session_state.upload_done = True
 
 
+def render_plan():
+    """Show what the upload would do and how long it would take."""
+    from src.planner import plan_release, summarize
+
+    meter = get_meter()
+    plans = [
+        plan_release(name, release, track_settings, config)
+        for name, release in releases.items()
+    ]
+    summary = summarize(plans, meter, max_workers, TRACK_UPLOAD_WORKERS)
+    cols = st.columns(4)
+    cols[0].metric("Релизов", summary["releases"])
+    cols[1].metric("Запросов", summary["requests"])
+    cols[2].metric("Объём", f"{summary['bytes'] / 1e6:.1f} МБ")
+    cols[3].metric("Время", f"≈ {summary['seconds'] / 60:.1f} мин")
+    if not summary["measured"]:
+        st.caption("Скорость ещё не измерялась, оценка по значениям по умолчанию")
+    if summary["bandwidth_limited"]:
+        st.caption(
+            f"Время ограничено скоростью канала "
+            f"({meter.total_throughput() / 1e6:.1f} МБ/с), а не числом потоков"
+        )
+    if summary["blocked"]:
+        st.error(f"Не будут загружены: {summary['blocked']}")
+    issues = [
+        {"Релиз": p["name"], "Тип": kind, "Описание": text}
+        for p in plans
+        for kind, key in (("Ошибка", "problems"), ("Предупреждение", "warnings"))
+        for text in p[key]
+    ]
+    if issues:
+        st.dataframe(issues, hide_index=True, use_container_width=True)
+    with st.expander("План запросов"):
+        st.dataframe(
+            [
+                {
+                    "Релиз": p["name"],
+                    "Тип": p["type"],
+                    "Шаг": STEP_LABELS.get(c.step, c.step),
+                    "Запрос": f"{c.method} {c.path}",
+                    "Трек": c.track,
+                    "Байт": c.bytes,
+                }
+                for p in plans
+                for c in p["calls"]
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
 if "upload_done" not in st.session_state:
     st.session_state.upload_done = False
 
 if not st.session_state.upload_done:
-    if st.button("Запустить загрузку", key="upload_button"):
+    upload_col, plan_col = st.columns(2)
+    upload_clicked = upload_col.button(
+        "Запустить загрузку", key="upload_button", disabled=bool(manifest_errors)
+    )
+    plan_clicked = plan_col.button(
+        "Оценить без загрузки", key="plan_button", disabled=not releases
+    )
+    if upload_clicked:
         run_all_uploads()
+    elif plan_clicked:
+        render_plan()
 else:
     if st.button("Загрузить ещё", key="upload_more"):
         st.session_state.upload_done = False
-        st.experimental_rerun()
+        st.rerun()
+
+
+# —————————————
+# Watch mode: upload pairs dropped into a folder
+# —————————————
+@st.cache_resource
+def watch_registry():
+    """Running folder watchers by resolved path, shared by all sessions.
+
+    The watcher threads outlive the session that started them, so every
+    session (including one after a page reload) attaches to this registry
+    instead of keeping the watcher in its own session state.
+    """
+    return {"lock": threading.Lock(), "watches": {}}
+
+
+def start_watch(folder):
+    """Start the folder watcher and a long-lived upload queue."""
+    from src.hot_folder import HotFolderWatcher  # pulls in watchdog
+
+    bus = EventBus()
+    exe = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="watch")
+
+    def upload_and_record(name, release, settings):
+        rid = upload_local_release(name, release, settings, bus)
+        if rid is not None:
+            # A retry would create a second draft, so record failed ones too
+            watcher.mark_uploaded(release["key"], rid)
+
+    def report_crash(name, fut):
+        exc = fut.exception()
+        if exc is not None:
+            bus.emit(name, RELEASE_STEP, FAILED, repr(exc))
+
+    def on_release(name, release):
+        settings = {}
+        for t in release["tracks"]:
+            artist, title, version = parse_track(t["stem"], name)
+            settings[t["stem"]] = {
+                "artist": artist,
+                "title": title,
+                "version": version,
+                "explicit": False,
+                "track_date": date.today().isoformat(),
+            }
+        bus.emit(name, RELEASE_STEP, QUEUED)
+        fut = exe.submit(upload_and_record, name, release, settings)
+        fut.add_done_callback(partial(report_crash, name))
+
+    watcher = HotFolderWatcher(folder, on_release)
+    watcher.start()
+    return {
+        "watcher": watcher,
+        "executor": exe,
+        "bus": bus,
+        "tracker": ProgressTracker(),
+        "lock": threading.Lock(),
+    }
+
+
+def stop_watch(watch):
+    watch["watcher"].stop()
+    save_stats(get_meter())
+    watch["executor"].shutdown(wait=False, cancel_futures=True)
+
+
+@st.fragment(run_every=WATCH_REFRESH)
+def watch_status(folder):
+    watch = watch_registry()["watches"].get(folder)
+    if not watch:
+        return
+    watcher, tracker = watch["watcher"], watch["tracker"]
+    with watch["lock"]:
+        # Several sessions may show the same watcher, apply events once
+        tracker.apply(watch["bus"].drain())
+    mode = "события ФС" if watcher.uses_events else "опрос"
+    st.caption(f"Папка: {watcher.folder} · режим: {mode}")
+    if watcher.last_error:
+        st.error(watcher.last_error)
+    widgets = {
+        "progress": st.progress(0.0),
+        "status": st.empty(),
+        "in_flight": st.empty(),
+        "errors": st.empty(),
+    }
+    render_progress(tracker, len(tracker.releases), widgets)
+
+
+st.markdown("---")
+st.subheader("Наблюдение за папкой")
+registry = watch_registry()
+for folder, watch in list(registry["watches"].items()):
+    if st.button(f"Остановить наблюдение: {folder}", key=f"watch_stop_{folder}"):
+        with registry["lock"]:
+            registry["watches"].pop(folder, None)
+        stop_watch(watch)
+        st.rerun()
+    watch_status(folder)
+
+watch_folder = st.text_input(
+    "Папка с WAV/PNG", config.get("watch_folder", ""), key="watch_folder"
+)
+st.caption(
+    "Загруженные релизы записываются в `.uploaded.yaml` в этой папке и "
+    "после перезапуска не загружаются повторно"
+)
+if st.button("Начать наблюдение", key="watch_start"):
+    if not watch_folder or not Path(watch_folder).is_dir():
+        st.error("Папка не найдена")
+    else:
+        config["watch_folder"] = watch_folder
+        folder = str(Path(watch_folder).resolve())
+        with registry["lock"]:
+            if folder not in registry["watches"]:
+                registry["watches"][folder] = start_watch(folder)
+        st.rerun()
+
+timer.mark("страница")
+timer.emit()
+if profiling_enabled():
+    st.sidebar.caption(timer.report())
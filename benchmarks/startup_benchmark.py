@@ -0,0 +1,157 @@
+"""Startup benchmark for MassAlligator.
+
+Prints JSON so that results of different builds can be compared:
+
+* ``imports`` – the slowest imports of the app modules (``python -X importtime``);
+* ``first_render`` – duration of the first script run of ``app.py``;
+* ``server_ready`` – seconds until a freshly started server answers its
+  health check.
+
+Usage::
+
+    python benchmarks/startup_benchmark.py --runs 3
+    python benchmarks/startup_benchmark.py --command dist/MassAlligator/MassAlligator.exe
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.startup import parse_importtime  # noqa: E402
+
+# Modules the app and its pages import at start or on first use
+APP_MODULES = [
+    "streamlit",
+    "yaml",
+    "requests",
+    "src.musicalligator_client",
+    "src.hot_folder",
+    "src.manifest",
+    "src.planner",
+]
+HEALTH_PATH = "/_stcore/health"
+
+FIRST_RENDER_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout={timeout})
+start = time.perf_counter()
+at.run()
+print(time.perf_counter() - start)
+"""
+
+
+def measure_imports(modules: list[str], top: int) -> list[dict]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return [
+        {"module": name, "cumulative_ms": cum / 1000, "self_ms": own / 1000}
+        for name, cum, own in parse_importtime(proc.stderr, top)
+    ]
+
+
+def measure_first_render(app: Path, timeout: float) -> float:
+    code = FIRST_RENDER_SNIPPET.format(root=str(ROOT), app=str(app), timeout=timeout)
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_server_ready(command: list[str], url: str, timeout: float) -> float:
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.1)
+        raise TimeoutError(f"{url} не ответил за {timeout} с")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def summary(values: list[float]) -> dict:
+    return {
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+        "runs": values,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="imports to show")
+    parser.add_argument("--app", default=str(ROOT / "app.py"))
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument(
+        "--command",
+        help="command that starts the build (default: streamlit run app.py)",
+    )
+    parser.add_argument("--url", help="health check URL of the started server")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args()
+
+    result: dict = {"imports": measure_imports(APP_MODULES, args.top)}
+    result["first_render"] = summary(
+        [measure_first_render(Path(args.app), args.timeout) for _ in range(args.runs)]
+    )
+    if not args.skip_server:
+        command = (
+            shlex.split(args.command)
+            if args.command
+            else [
+                sys.executable,
+                "-m",
+                "streamlit",
+                "run",
+                args.app,
+                "--server.headless",
+                "true",
+                "--server.port",
+                str(args.port),
+            ]
+        )
+        url = args.url or f"http://localhost:{args.port}{HEALTH_PATH}"
+        result["server_ready"] = summary(
+            [measure_server_ready(command, url, args.timeout) for _ in range(args.runs)]
+        )
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,9 @@ import io
 from pathlib import Path
 from typing import Dict, Optional
 
-import numpy as np
 import streamlit as st
-import yaml
-from PIL import Image
+
+from src.config_store import ConfigError, get_store
 
 CONFIG_FILE = Path("cover_config.yaml")
 DEFAULT_CONFIG = {
@@ -18,23 +17,17 @@ DEFAULT_CONFIG = {
 }
 
 
-def load_config() -> dict:
-    if CONFIG_FILE.exists():
-        with CONFIG_FILE.open("r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or DEFAULT_CONFIG.copy()
-    CONFIG_FILE.write_text(yaml.safe_dump(DEFAULT_CONFIG), encoding="utf-8")
-    return DEFAULT_CONFIG.copy()
-
-
-def save_config(cfg: dict) -> None:
-    CONFIG_FILE.write_text(yaml.safe_dump(cfg), encoding="utf-8")
-
-
-config: Dict[str, Optional[str | int]] = load_config()
+store = get_store(CONFIG_FILE, DEFAULT_CONFIG)
 
 st.set_page_config(page_title="Массовая обработка обложек", layout="wide")
 st.title("🎧 Массовая обработка обложек")
 
+try:
+    config: Dict[str, Optional[str | int]] = {**DEFAULT_CONFIG, **store.load()}
+except ConfigError as exc:
+    st.error(str(exc))
+    st.stop()
+
 with st.sidebar:
     st.header("⚙️ Настройки")
 
@@ -44,7 +37,6 @@ with st.sidebar:
         st.image(config["texture_path"], width=100)
         if st.button("Заменить текстуру"):
             config["texture_path"] = None
-            save_config(config)
         else:
             texture_path = config["texture_path"]
     if texture_path is None:
@@ -57,7 +49,6 @@ with st.sidebar:
             path = tex_dir / uploaded_tex.name
             path.write_bytes(uploaded_tex.read())
             config["texture_path"] = str(path)
-            save_config(config)
             texture_path = str(path)
 
     modes = ["overlay", "multiply", "screen"]
@@ -78,7 +69,8 @@ with st.sidebar:
         config["output_dir"] = st.text_input("Имя новой папки", value=current)
     else:
         config["output_dir"] = sel
-    save_config(config)
+    # Written only when a setting actually changed
+    store.save(config)
 
 wavs = st.file_uploader(
     "1) Загрузите WAV-файлы", type=["wav"], accept_multiple_files=True
@@ -87,6 +79,9 @@ if not wavs:
     st.info("Загрузите WAV-файлы для начала")
     st.stop()
 
+# numpy and PIL are slow to import, load them only once there is work to do
+from PIL import Image  # noqa: E402
+
 st.subheader("2) Добавьте обложки к трекам")
 cover_data: Dict[str, bytes] = {}
 for wav in wavs:
@@ -101,6 +96,8 @@ for wav in wavs:
             cover_data[wav.name] = data
 
 if st.button("▶️ Запуск"):
+    import numpy as np
+
     missing = [w.name for w in wavs if w.name not in cover_data]
     if missing:
         st.error(f"Нет обложек для: {', '.join(missing)}")
@@ -2,16 +2,18 @@ from __future__ import annotations
 
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-import pandas as pd
 import requests  # type: ignore
 import streamlit as st
-import yaml  # type: ignore
 
+from src.config_store import ConfigError, main_config_store
 from src.musicalligator_client import MusicAlligatorClient
+from src.status_tracker import ReleaseStatusTracker, StatusChange
 
 CONFIG_PATH = Path("config.yaml")
+# Seconds between redraws of the status tracker panel
+STATUS_REFRESH = 5.0
 
 # Release statuses supported by the API
 # Statuses available for filtering
@@ -42,13 +44,6 @@ STATUS_LABELS: Dict[str, str] = {
 }
 
 
-def load_config() -> Dict[str, Any]:
-    if CONFIG_PATH.exists():
-        with CONFIG_PATH.open("r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
-    return {}
-
-
 def fetch_releases(
     artist_id: int, status: str, session: requests.Session
 ) -> List[Dict[str, Any]]:
@@ -99,11 +94,15 @@ def moderate_release(release_id: int, session: requests.Session) -> bool:
     return False
 
 
-config = load_config()
-
 st.set_page_config(page_title="Модерация релизов", layout="wide")
 st.title("📤 Массовая отправка на модерацию")
 
+try:
+    config = main_config_store(CONFIG_PATH).load()
+except ConfigError as exc:
+    st.error("Ошибка в config.yaml:\n\n" + "\n".join(f"- {p}" for p in exc.problems))
+    st.stop()
+
 if not config.get("auth_token"):
     st.error("Отсутствует токен в config.yaml")
     st.stop()
@@ -117,6 +116,22 @@ client = MusicAlligatorClient(config["auth_token"])
 session = client.session
 
 
+@st.cache_resource
+def get_status_tracker(token: str) -> ReleaseStatusTracker:
+    """One status tracker per token, shared by all sessions.
+
+    Its polling thread outlives the session that started it, so every
+    session (including one after a page reload) attaches to this tracker
+    instead of starting its own.
+    """
+    return ReleaseStatusTracker(MusicAlligatorClient(token).clone_session())
+
+
+def active_tracker() -> Optional[ReleaseStatusTracker]:
+    tracker = get_status_tracker(config["auth_token"])
+    return tracker if tracker.running else None
+
+
 def load_release_list() -> None:
     artist_id = artists[st.session_state.sel_artist]
     status = st.session_state.sel_status
@@ -139,6 +154,84 @@ def load_release_list() -> None:
 
     st.session_state.release_list = results.get(status, [])
     st.session_state.stats = {s: len(results.get(s, [])) for s in STATUS_OPTIONS}
+    st.session_state.all_releases = [r for rs in results.values() for r in rs]
+    tracker = active_tracker()
+    if tracker is not None:
+        tracker.track(st.session_state.all_releases)
+
+
+def ui_status(status: str) -> str:
+    """Status name used in the UI for a status returned by the API."""
+    return next((k for k, v in STATUS_QUERY_MAP.items() if v == status), status)
+
+
+def apply_status_changes(changes: List[StatusChange]) -> None:
+    """Update the counters and the shown list without refetching everything."""
+    stats = st.session_state.get("stats", {})
+    for c in changes:
+        old, new = ui_status(c.old), ui_status(c.new)
+        if old in stats:
+            stats[old] = max(0, stats[old] - 1)
+        if new in stats:
+            stats[new] += 1
+    moved = {c.release_id: ui_status(c.new) for c in changes}
+    current = st.session_state.sel_status
+    st.session_state.release_list = [
+        r
+        for r in st.session_state.release_list
+        if moved.get(r.get("releaseId"), current) == current
+    ]
+
+
+def start_tracking() -> None:
+    tracker = get_status_tracker(config["auth_token"])
+    tracker.track(st.session_state.get("all_releases", []))
+    tracker.start()
+    st.session_state.status_seen = tracker.change_count
+
+
+def stop_tracking() -> None:
+    get_status_tracker(config["auth_token"]).stop()
+
+
+def toggle_tracking() -> None:
+    if st.session_state.track_statuses:
+        start_tracking()
+    else:
+        stop_tracking()
+
+
+@st.fragment(run_every=STATUS_REFRESH)
+def status_panel() -> None:
+    tracker = active_tracker()
+    if tracker is None:
+        return
+    # A session attaching to a running tracker only toasts newer changes
+    st.session_state.setdefault("status_seen", tracker.change_count)
+    st.caption(
+        f"В работе: {len(tracker.in_flight())} · "
+        f"следующая проверка через ~{tracker.interval:.0f} с · "
+        f"запросов к API: {tracker.requests}"
+    )
+    if tracker.last_error:
+        st.warning(f"Ошибка опроса: {tracker.last_error}")
+    for r in tracker.errors():
+        st.error(f"❗ {r.get('title', '')} ({r.get('releaseId')}): статус ERROR")
+    changes = list(tracker.changes)
+    if changes:
+        st.dataframe(
+            [c.to_dict() for c in reversed(changes)],
+            hide_index=True,
+            use_container_width=True,
+        )
+    new = tracker.change_count - st.session_state.status_seen
+    if new > 0:
+        st.session_state.status_seen = tracker.change_count
+        fresh = changes[-new:]
+        for c in fresh:
+            st.toast(f"{'❗ ' if c.is_error else ''}{c.title}: {c.old} → {c.new}")
+        apply_status_changes(fresh)
+        st.rerun(scope="app")
 
 
 if "sel_artist" not in st.session_state:
@@ -169,6 +262,8 @@ if st.session_state.get("stats"):
         )
 
 if st.session_state.release_list:
+    import pandas as pd  # only needed for the release table
+
     id_to_name = {v: k for k, v in artists.items()}
     rows = []
     for d in st.session_state.release_list:
@@ -197,9 +292,24 @@ if st.session_state.release_list:
     )
     selected_ids = edited[edited["select"]]["ID"].tolist()
     if st.button("Отправить выбранные") and selected_ids:
+        tracker = active_tracker()
         for rid in selected_ids:
             if moderate_release(int(rid), session):
                 st.toast(f"Релиз {rid} отправлен")
+                if tracker is not None:
+                    tracker.set_status(int(rid), "MODERATE")
         load_release_list()
 else:
     st.info("Нет релизов")
+
+st.markdown("---")
+st.subheader("Отслеживание статусов")
+# The tracker is shared, so another session may have started or stopped it
+st.session_state.track_statuses = active_tracker() is not None
+st.toggle(
+    "Следить за изменением статусов",
+    key="track_statuses",
+    on_change=toggle_tracking,
+    help="Опрашивает уведомления вместо повторной загрузки всех релизов",
+)
+status_panel()
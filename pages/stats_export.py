@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import Dict
+
+import streamlit as st
+
+from src.config_store import ConfigError, main_config_store
+from src.musicalligator_client import MusicAlligatorClient
+from src.stats_export import (
+    DB_PATH,
+    EXPORT_WORKERS,
+    STREAM_GROUPS,
+    StatsExporter,
+    StatsStore,
+)
+
+CONFIG_PATH = Path("config.yaml")
+
+GROUP_LABELS: Dict[str, str] = {
+    "month": "Месяц",
+    "platform": "Площадка",
+    "artist": "Артист",
+    "day": "День",
+}
+
+
+@st.cache_resource
+def get_store() -> StatsStore:
+    return StatsStore(DB_PATH)
+
+
+st.set_page_config(page_title="Статистика и финансы", layout="wide")
+st.title("📊 Выгрузка статистики и финансов")
+
+try:
+    config = main_config_store(CONFIG_PATH).load()
+except ConfigError as exc:
+    st.error("Ошибка в config.yaml:\n\n" + "\n".join(f"- {p}" for p in exc.problems))
+    st.stop()
+
+if not config.get("auth_token"):
+    st.error("Отсутствует токен в config.yaml")
+    st.stop()
+
+artists: Dict[str, int] = config.get("artists", {})
+if not artists:
+    st.error("В config.yaml нет артистов")
+    st.stop()
+
+store = get_store()
+
+selected = st.multiselect(
+    "Артисты", list(artists), default=list(artists), key="stats_artists"
+)
+col1, col2 = st.columns(2)
+start = col1.date_input(
+    "С даты", date(date.today().year, 1, 1), key="stats_start", max_value=date.today()
+)
+workers = col2.number_input(
+    "Параллельные запросы",
+    min_value=1,
+    max_value=8,
+    value=EXPORT_WORKERS,
+    step=1,
+    key="stats_workers",
+)
+
+if st.button("Выгрузить", key="stats_export", disabled=not selected):
+    exporter = StatsExporter(
+        MusicAlligatorClient(config["auth_token"]), store, int(workers)
+    )
+    progress = st.progress(0.0)
+
+    def show_progress(done: int, total: int) -> None:
+        progress.progress(done / total)
+
+    result = exporter.export_all(
+        [artists[name] for name in selected], start, on_progress=show_progress
+    )
+    progress.empty()
+    st.success(
+        f"Строк записано: {result.rows}, запросов: {result.requests}, "
+        f"уже выгруженных периодов пропущено: {result.skipped}"
+    )
+    for error in result.errors:
+        st.warning(error)
+
+st.markdown("---")
+by = st.selectbox(
+    "Группировать прослушивания",
+    list(STREAM_GROUPS),
+    format_func=lambda k: GROUP_LABELS.get(k, k),
+    key="stats_group",
+)
+names = {v: k for k, v in artists.items()}
+totals = store.stream_totals(by, [artists[name] for name in selected])
+if totals:
+    st.dataframe(
+        [
+            {
+                GROUP_LABELS[by]: names.get(key, key) if by == "artist" else key,
+                "Прослушивания": count,
+            }
+            for key, count in totals
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+else:
+    st.info("Нет выгруженной статистики")
+
+transactions = store.transaction_totals()
+if transactions:
+    st.subheader("Транзакции")
+    st.dataframe(
+        [
+            {"Тип": kind, "Статус": status, "Сумма": amount}
+            for kind, status, amount in transactions
+        ],
+        hide_index=True,
+    )
+if DB_PATH.exists():
+    st.caption(f"Данные хранятся в `{DB_PATH}` (SQLite)")
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import copy
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml  # type: ignore
+
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "auth_token": "",
+    "artists": {},
+    "labels": {},
+    "presets": {},
+    "streaming_platforms": [195, 196, 197],
+}
+PRESET_INT_FIELDS = ["label_id", "genre_id", "recording_year", "language_id"]
+PRESET_LIST_FIELDS = ["composers", "lyricists"]
+
+
+class ConfigError(ValueError):
+    """Raised when a config file can't be parsed or fails validation."""
+
+    def __init__(self, path: Path, problems: List[str]) -> None:
+        super().__init__(f"{path}: " + "; ".join(problems))
+        self.path = path
+        self.problems = problems
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_id_map(cfg: Dict[str, Any], key: str, problems: List[str]) -> None:
+    value = cfg.get(key) or {}
+    if not isinstance(value, dict):
+        problems.append(f"'{key}' должен быть словарём имя: id")
+        return
+    for name, item_id in value.items():
+        if not _is_int(item_id):
+            problems.append(f"'{key}.{name}': id должен быть числом")
+
+
+def validate_config(cfg: Dict[str, Any]) -> List[str]:
+    """Return schema problems of the main ``config.yaml``."""
+    problems: List[str] = []
+    _check_id_map(cfg, "artists", problems)
+    _check_id_map(cfg, "labels", problems)
+
+    platforms = cfg.get("streaming_platforms") or []
+    if not isinstance(platforms, list) or not all(_is_int(p) for p in platforms):
+        problems.append("'streaming_platforms' должен быть списком чисел")
+
+    presets = cfg.get("presets") or {}
+    if not isinstance(presets, dict):
+        problems.append("'presets' должен быть словарём артист: пресет")
+        return problems
+    for artist, preset in presets.items():
+        if not isinstance(preset, dict):
+            problems.append(f"'presets.{artist}' должен быть словарём")
+            continue
+        for field in PRESET_INT_FIELDS:
+            if (
+                field in preset
+                and preset[field] is not None
+                and not _is_int(preset[field])
+            ):
+                problems.append(f"'presets.{artist}.{field}' должен быть числом")
+        for field in PRESET_LIST_FIELDS:
+            value = preset.get(field) or []
+            if not isinstance(value, list) or not all(_is_int(v) for v in value):
+                problems.append(f"'presets.{artist}.{field}' должен быть списком id")
+    return problems
+
+
+class ConfigStore:
+    """YAML config file shared by all pages.
+
+    The file is parsed only when its modification time or size changes.
+    ``save`` writes only when the content differs from what is on disk and
+    replaces the file atomically (temp file + rename), so a reader never
+    sees a truncated file. Use :func:`get_store` to share one instance
+    (and its lock) per path.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        defaults: Optional[Dict[str, Any]] = None,
+        validator: Optional[Validator] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.defaults = defaults or {}
+        self.validator = validator
+        self._lock = threading.RLock()
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._data: Optional[Dict[str, Any]] = None
+
+    def _current_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Dict[str, Any]:
+        """Return a copy of the config, re-reading the file only if it changed."""
+        with self._lock:
+            stamp = self._current_stamp()
+            if stamp is None:
+                return copy.deepcopy(self.defaults)
+            if stamp != self._stamp or self._data is None:
+                try:
+                    with self.path.open("r", encoding="utf-8") as f:
+                        data = yaml.safe_load(f) or {}
+                except yaml.YAMLError as exc:
+                    raise ConfigError(self.path, [str(exc)]) from exc
+                if not isinstance(data, dict):
+                    raise ConfigError(self.path, ["ожидается словарь"])
+                problems = self.validator(data) if self.validator else []
+                if problems:
+                    raise ConfigError(self.path, problems)
+                self._data, self._stamp = data, stamp
+            return copy.deepcopy(self._data)
+
+    def save(self, cfg: Dict[str, Any]) -> bool:
+        """Write ``cfg`` if it differs from the stored config.
+
+        Returns ``True`` when the file was written.
+        """
+        with self._lock:
+            if self._current_stamp() is not None:
+                try:
+                    if self.load() == cfg:
+                        return False
+                except ConfigError:
+                    pass  # overwrite a broken file
+            problems = self.validator(cfg) if self.validator else []
+            if problems:
+                raise ConfigError(self.path, problems)
+            text = yaml.safe_dump(cfg, allow_unicode=True)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(
+                dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._data = copy.deepcopy(cfg)
+            self._stamp = self._current_stamp()
+            return True
+
+
+_stores: Dict[Path, ConfigStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(
+    path: Path | str,
+    defaults: Optional[Dict[str, Any]] = None,
+    validator: Optional[Validator] = None,
+) -> ConfigStore:
+    """Return the process-wide store for ``path``."""
+    key = Path(path).resolve()
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ConfigStore(path, defaults, validator)
+        return _stores[key]
+
+
+def main_config_store(path: Path | str = "config.yaml") -> ConfigStore:
+    """Store of the main ``config.yaml`` with its schema validation."""
+    return get_store(path, DEFAULT_CONFIG, validate_config)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.config_store import get_store
+from src.release_files import track_number
+
+Observer: Optional[Any]
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except Exception:  # watchdog is optional, fall back to polling
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None
+
+# File suffix -> key used by ``upload_release``
+FILE_KINDS: Dict[str, str] = {".wav": "audio", ".png": "cover"}
+# File that marks a subfolder release as fully copied
+READY_MARKER = ".ready"
+# File inside the watched folder listing the releases already uploaded
+UPLOADED_FILE = ".uploaded.yaml"
+
+Release = Tuple[str, Dict[str, Any]]
+Key = Tuple[str, str]
+
+
+class _WakeHandler(FileSystemEventHandler):  # type: ignore[misc,valid-type]
+    def __init__(self, wake: threading.Event) -> None:
+        super().__init__()
+        self._wake = wake
+
+    def on_any_event(self, event: object) -> None:
+        self._wake.set()
+
+
+class HotFolderWatcher:
+    """Watch a folder and report releases once all their files are complete.
+
+    Top-level WAV/PNG pairs with the same stem become singles. Every
+    subfolder with at least one WAV and one PNG becomes a multi-track
+    release named after the folder. A file is considered complete when its
+    size and modification time have not changed for ``settle_seconds``.
+    Since an album may be copied in several batches, a subfolder is
+    complete only when it contains a ``.ready`` marker file or none of its
+    files changed for ``folder_settle_seconds``. Each release is reported
+    only once; releases recorded with :meth:`mark_uploaded` are kept in
+    ``.uploaded.yaml`` inside the folder and skipped after a restart too.
+    Filesystem events (via ``watchdog`` when installed) only wake the scan
+    loop early; the stability check itself always works by polling.
+    """
+
+    def __init__(
+        self,
+        folder: Path | str,
+        on_release: Callable[[str, Dict[str, Any]], None],
+        settle_seconds: float = 3.0,
+        poll_interval: float = 1.0,
+        idle_interval: float = 30.0,
+        folder_settle_seconds: float = 60.0,
+    ) -> None:
+        self.folder = Path(folder)
+        self.on_release = on_release
+        self.settle_seconds = settle_seconds
+        self.folder_settle_seconds = folder_settle_seconds
+        self.poll_interval = poll_interval
+        self.idle_interval = idle_interval
+        self.last_error = ""
+        self._files: Dict[Path, Tuple[Tuple[int, int], float]] = {}
+        self._store = get_store(self.folder / UPLOADED_FILE)
+        self._store_lock = threading.Lock()
+        self._seen: Set[Key] = {_parse_key(k) for k in self.uploaded()}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._observer: Optional[Any] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def uses_events(self) -> bool:
+        return self._observer is not None
+
+    def uploaded(self) -> Dict[str, Any]:
+        """Uploaded releases as ``{"file/<stem>" or "dir/<name>": release id}``."""
+        return self._store.load().get("uploaded") or {}
+
+    def mark_uploaded(self, key: Key, release_id: Any) -> None:
+        """Record that the release ``key`` was uploaded, across restarts."""
+        with self._store_lock:
+            data = self._store.load()
+            data.setdefault("uploaded", {})[_format_key(key)] = release_id
+            self._store.save(data)
+
+    def _key(self, path: Path) -> Key:
+        # Files in subfolders belong to the folder release, others to their stem
+        if path.parent == self.folder:
+            return ("file", path.stem)
+        return ("dir", path.parent.name)
+
+    def _media_files(self) -> List[Path]:
+        paths = []
+        for entry in self.folder.iterdir():
+            children = entry.iterdir() if entry.is_dir() else [entry]
+            for path in children:
+                if path.suffix.lower() in FILE_KINDS and path.is_file():
+                    paths.append(path)
+        return paths
+
+    def scan(self, now: Optional[float] = None) -> List[Release]:
+        """Check the folder once and return newly completed releases."""
+        now = time.monotonic() if now is None else now
+        present = set()
+        for path in self._media_files():
+            stat = path.stat()
+            sig = (stat.st_size, stat.st_mtime_ns)
+            present.add(path)
+            prev = self._files.get(path)
+            if prev is None or prev[0] != sig:
+                self._files[path] = (sig, now)
+        for path in set(self._files) - present:
+            del self._files[path]
+
+        groups: Dict[Key, List[Path]] = {}
+        unstable: Set[Key] = set()
+        changed: Dict[Key, float] = {}
+        for path, (sig, since) in self._files.items():
+            key = self._key(path)
+            if key in self._seen:
+                continue
+            changed[key] = max(changed.get(key, since), since)
+            if sig[0] > 0 and now - since >= self.settle_seconds:
+                groups.setdefault(key, []).append(path)
+            else:
+                unstable.add(key)
+
+        releases = []
+        for key, paths in sorted(groups.items()):
+            if key in unstable:
+                continue
+            if (
+                key[0] == "dir"
+                and not self._ready(key)
+                and now - changed[key] < self.folder_settle_seconds
+            ):
+                continue
+            release = _release(key, paths)
+            if release is not None:
+                self._seen.add(key)
+                release["key"] = key
+                releases.append((key[1], release))
+        return releases
+
+    def _ready(self, key: Key) -> bool:
+        return (self.folder / key[1] / READY_MARKER).is_file()
+
+    def _pending(self) -> bool:
+        return any(self._key(path) not in self._seen for path in self._files)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                releases = self.scan()
+                self.last_error = ""
+            except OSError as exc:
+                releases = []
+                self.last_error = str(exc)
+            for name, release in releases:
+                self.on_release(name, release)
+            timeout = (
+                self.poll_interval
+                if self._pending() or not self.uses_events
+                else self.idle_interval
+            )
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(
+                    _WakeHandler(self._wake), str(self.folder), recursive=True
+                )
+                observer.start()
+                self._observer = observer
+            except Exception:  # noqa: BLE001
+                self._observer = None
+        self._thread = threading.Thread(
+            target=self._run, name="hot-folder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def _format_key(key: Key) -> str:
+    return f"{key[0]}/{key[1]}"
+
+
+def _parse_key(text: str) -> Key:
+    kind, _, name = text.partition("/")
+    return (kind, name)
+
+
+def _release(key: Key, paths: List[Path]) -> Optional[Dict[str, Any]]:
+    return _folder_release(key[1], paths) if key[0] == "dir" else _pair(paths)
+
+
+def _pair(paths: List[Path]) -> Optional[Dict[str, Any]]:
+    files = {FILE_KINDS[p.suffix.lower()]: p for p in paths}
+    if len(files) < len(FILE_KINDS):
+        return None
+    return {
+        "cover": files["cover"],
+        "tracks": [{"stem": files["audio"].stem, "audio": files["audio"]}],
+    }
+
+
+def _track_order(path: Path) -> Tuple[bool, int, str]:
+    # "2 Song" before "10 Song", unnumbered tracks last
+    number = track_number(path.stem)
+    return (number is None, number or 0, path.stem)
+
+
+def _folder_release(name: str, paths: List[Path]) -> Optional[Dict[str, Any]]:
+    wavs = sorted(
+        (p for p in paths if FILE_KINDS[p.suffix.lower()] == "audio"), key=_track_order
+    )
+    pngs = sorted(p for p in paths if FILE_KINDS[p.suffix.lower()] == "cover")
+    if not wavs or not pngs:
+        return None
+    # Prefer "cover.png" or a PNG named after the folder
+    cover = next(
+        (p for p in pngs if p.stem.lower() in ("cover", name.lower())), pngs[0]
+    )
+    return {
+        "cover": cover,
+        "tracks": [{"stem": p.stem, "audio": p} for p in wavs],
+    }
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import yaml  # type: ignore
+
+from src.release_files import RELEASE_TYPES, parse_track
+
+# Columns understood in a manifest; only ``file`` is required
+MANIFEST_COLUMNS = [
+    "file",
+    "release",
+    "artist",
+    "title",
+    "version",
+    "explicit",
+    "track_date",
+    "release_date",
+    "release_type",
+    "genre_id",
+    "label",
+    "composers",
+    "lyricists",
+    "platforms",
+]
+# Values that apply to the whole release and must agree between its rows
+RELEASE_COLUMNS = ["release_date", "release_type", "genre_id", "label", "platforms"]
+# Separator of list values (persons, platforms) inside one cell
+LIST_SEPARATOR = ";"
+
+TRUE_VALUES = {"1", "true", "yes", "y", "да", "+", "x"}
+FALSE_VALUES = {"", "0", "false", "no", "n", "нет", "-"}
+
+
+@dataclass(frozen=True)
+class ManifestError:
+    """Problem found in one manifest row."""
+
+    row: int
+    column: str
+    message: str
+    file: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "Строка": self.row,
+            "Файл": self.file,
+            "Колонка": self.column,
+            "Ошибка": self.message,
+        }
+
+
+@dataclass
+class References:
+    """Reference data used to validate a manifest without network calls.
+
+    ``artists`` should contain only artists that have a preset, since an
+    upload cannot proceed without one.
+    """
+
+    artists: Dict[str, int] = field(default_factory=dict)
+    labels: Dict[str, int] = field(default_factory=dict)
+    persons: Dict[str, int] = field(default_factory=dict)
+    platforms: Dict[str, int] = field(default_factory=dict)
+
+
+def load_manifest(data: bytes, filename: str) -> List[Dict[str, Any]]:
+    """Parse a CSV or YAML manifest into a list of raw rows."""
+    text = data.decode("utf-8-sig")
+    if Path(filename).suffix.lower() in (".yaml", ".yml"):
+        parsed = yaml.safe_load(text) or []
+        if isinstance(parsed, dict):
+            parsed = parsed.get("tracks", [])
+        if not isinstance(parsed, list) or not all(isinstance(r, dict) for r in parsed):
+            raise ValueError("Манифест YAML должен быть списком треков")
+        return parsed
+    try:
+        dialect = csv.Sniffer().sniff(text.split("\n", 1)[0], delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel  # type: ignore[assignment]
+    reader = csv.DictReader(io.StringIO(text), dialect=dialect)
+    return [{(k or "").strip().lower(): v for k, v in row.items()} for row in reader]
+
+
+def _lookup(index: Dict[str, int]) -> Tuple[Dict[str, int], set]:
+    return {name.casefold(): i for name, i in index.items()}, set(index.values())
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _stem(name: str) -> str:
+    # Names like "Mr. X - Song" have no extension, so only strip known ones
+    path = Path(name)
+    return path.stem if path.suffix.lower() in (".wav", ".png") else name
+
+
+def _items(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [_text(v) for v in value if _text(v)]
+    return [v.strip() for v in _text(value).split(LIST_SEPARATOR) if v.strip()]
+
+
+class _RowChecker:
+    def __init__(self, refs: References) -> None:
+        self.artists = _lookup(refs.artists)
+        self.labels = _lookup(refs.labels)
+        self.persons = _lookup(refs.persons)
+        self.platforms = _lookup(refs.platforms)
+        self.errors: List[ManifestError] = []
+        self.row = 0
+        self.file = ""
+
+    def error(self, column: str, message: str) -> None:
+        self.errors.append(ManifestError(self.row, column, message, self.file))
+
+    def ref(
+        self, column: str, value: str, index: Tuple[Dict[str, int], set]
+    ) -> Optional[int]:
+        names, ids = index
+        if value.casefold() in names:
+            return names[value.casefold()]
+        if value.isdigit() and int(value) in ids:
+            return int(value)
+        self.error(column, f"Неизвестное значение '{value}'")
+        return None
+
+    def refs(
+        self, column: str, value: Any, index: Tuple[Dict[str, int], set]
+    ) -> List[int]:
+        found = [self.ref(column, v, index) for v in _items(value)]
+        return [i for i in found if i is not None]
+
+    def flag(self, column: str, value: Any) -> bool:
+        if isinstance(value, bool):
+            return value
+        text = _text(value).lower()
+        if text in TRUE_VALUES:
+            return True
+        if text not in FALSE_VALUES:
+            self.error(column, f"Ожидается да/нет, получено '{value}'")
+        return False
+
+    def day(self, column: str, value: Any) -> Optional[str]:
+        if isinstance(value, date):
+            return value.isoformat()
+        text = _text(value)
+        if not text:
+            return None
+        try:
+            return date.fromisoformat(text).isoformat()
+        except ValueError:
+            self.error(column, f"Дата должна быть в формате ГГГГ-ММ-ДД: '{text}'")
+            return None
+
+    def choice(self, column: str, value: Any, options: List[str]) -> Optional[str]:
+        text = _text(value).upper()
+        if not text:
+            return None
+        if text not in options:
+            self.error(column, f"Ожидается одно из {', '.join(options)}: '{value}'")
+            return None
+        return text
+
+    def number(self, column: str, value: Any) -> Optional[int]:
+        text = _text(value)
+        if not text:
+            return None
+        if not text.isdigit():
+            self.error(column, f"Ожидается число, получено '{text}'")
+            return None
+        return int(text)
+
+
+def validate_manifest(
+    raw_rows: Iterable[Dict[str, Any]],
+    refs: References,
+    available: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Tuple[List[Dict[str, Any]], List[ManifestError]]:
+    """Validate all rows offline and resolve names to ids.
+
+    ``available`` maps uploaded file stems to their files; when given,
+    every row must have a WAV. Returns the resolved rows and the list of
+    errors; the rows should not be uploaded when errors are present.
+    """
+    check = _RowChecker(refs)
+    rows: List[Dict[str, Any]] = []
+    seen: Dict[str, int] = {}
+    for n, raw in enumerate(raw_rows, start=1):
+        raw = {str(k).strip().lower(): v for k, v in raw.items()}
+        check.row = n
+        check.file = stem = _stem(_text(raw.get("file")))
+        if not stem:
+            check.error("file", "Не указан файл")
+            continue
+        if stem in seen:
+            check.error("file", f"Файл уже указан в строке {seen[stem]}")
+            continue
+        seen[stem] = n
+        if available is not None and "audio" not in available.get(stem, {}):
+            check.error("file", "Нет WAV-файла среди загруженных")
+        for column in raw:
+            if column not in MANIFEST_COLUMNS:
+                check.error(column, "Неизвестная колонка")
+
+        release = _text(raw.get("release")) or stem
+        p_artist, p_title, p_version = parse_track(stem, release)
+        artist = _text(raw.get("artist")) or p_artist
+        artist_id = check.ref("artist", artist, check.artists) if artist else None
+        if not artist:
+            check.error("artist", "Не указан артист")
+        title = _text(raw.get("title")) or p_title
+        if not title:
+            check.error("title", "Не указано название")
+        label = _text(raw.get("label"))
+        rows.append(
+            {
+                "row": n,
+                "file": stem,
+                "release": release,
+                "artist": artist,
+                "artist_id": artist_id,
+                "title": title,
+                "version": _text(raw.get("version")) if "version" in raw else p_version,
+                "explicit": check.flag("explicit", raw.get("explicit")),
+                "track_date": check.day("track_date", raw.get("track_date")),
+                "release_date": check.day("release_date", raw.get("release_date")),
+                "release_type": check.choice(
+                    "release_type", raw.get("release_type"), RELEASE_TYPES
+                ),
+                "genre_id": check.number("genre_id", raw.get("genre_id")),
+                "label_id": check.ref("label", label, check.labels) if label else None,
+                "composers": check.refs(
+                    "composers", raw.get("composers"), check.persons
+                ),
+                "lyricists": check.refs(
+                    "lyricists", raw.get("lyricists"), check.persons
+                ),
+                "platforms": check.refs(
+                    "platforms", raw.get("platforms"), check.platforms
+                ),
+            }
+        )
+
+    # Release-level values must not contradict each other
+    first: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for row in rows:
+        check.row, check.file = row["row"], row["file"]
+        for column in RELEASE_COLUMNS:
+            key = "label_id" if column == "label" else column
+            if not row[key]:
+                continue
+            head = first.setdefault((row["release"], key), row)
+            if row[key] != head[key]:
+                check.error(
+                    column, f"Отличается от строки {head['row']} того же релиза"
+                )
+    check.errors.sort(key=lambda e: e.row)
+    return rows, check.errors
+
+
+def manifest_releases(
+    rows: List[Dict[str, Any]], groups: Dict[str, Dict[str, Any]]
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Build releases and per-track settings from validated rows.
+
+    The result has the same shape as :func:`group_releases` plus release
+    ``options`` that override the artist preset.
+    """
+    releases: Dict[str, Dict[str, Any]] = {}
+    settings: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        name = row["release"]
+        files = groups.get(row["file"], {})
+        rel = releases.setdefault(
+            name,
+            {
+                "cover": groups.get(name, {}).get("cover"),
+                "tracks": [],
+                "options": {"artist": row["artist"]},
+            },
+        )
+        if rel["cover"] is None:
+            rel["cover"] = files.get("cover")
+        rel["tracks"].append({"stem": row["file"], "audio": files.get("audio")})
+        options = rel["options"]
+        for key in (
+            "release_date",
+            "release_type",
+            "genre_id",
+            "label_id",
+            "platforms",
+        ):
+            if row[key] and not options.get(key):
+                options[key] = row[key]
+        if name == row["file"]:
+            options.update(title=row["title"], version=row["version"])
+        settings[row["file"]] = {
+            "artist": row["artist"],
+            "title": row["title"],
+            "version": row["version"],
+            "explicit": row["explicit"],
+            "track_date": row["track_date"] or date.today().isoformat(),
+            "genre_id": row["genre_id"],
+            "composers": row["composers"],
+            "lyricists": row["lyricists"],
+        }
+    return releases, settings
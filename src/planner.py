@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import heapq
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.release_files import release_identity, release_type
+
+# Assumed network characteristics until real uploads have been measured
+DEFAULT_BYTES_PER_SECOND = 1_000_000.0
+DEFAULT_REQUEST_SECONDS = 0.5
+# Requests smaller than this are used to measure latency, larger ones throughput
+SMALL_REQUEST_BYTES = 64 * 1024
+
+
+class ThroughputMeter:
+    """Running estimate of request latency and upload throughput.
+
+    Samples come from real responses (body size and ``Response.elapsed``)
+    and are smoothed with an exponential moving average. Safe to update
+    from worker threads. ``total_bytes_per_second`` is the bandwidth of
+    whole upload runs (all bytes over wall time), which parallel uploads
+    share and cannot exceed.
+    """
+
+    def __init__(
+        self,
+        bytes_per_second: Optional[float] = None,
+        request_seconds: Optional[float] = None,
+        total_bytes_per_second: Optional[float] = None,
+        alpha: float = 0.2,
+    ) -> None:
+        self.bytes_per_second = bytes_per_second
+        self.request_seconds = request_seconds
+        self.total_bytes_per_second = total_bytes_per_second
+        self.alpha = alpha
+        self._lock = threading.Lock()
+
+    @property
+    def measured(self) -> bool:
+        return self.bytes_per_second is not None and self.request_seconds is not None
+
+    def _avg(self, old: Optional[float], new: float) -> float:
+        return new if old is None else old + self.alpha * (new - old)
+
+    def record(self, nbytes: int, seconds: float) -> None:
+        if seconds <= 0:
+            return
+        with self._lock:
+            if nbytes < SMALL_REQUEST_BYTES:
+                self.request_seconds = self._avg(self.request_seconds, seconds)
+                return
+            latency = self.request_seconds or 0.0
+            transfer = max(seconds - latency, seconds / 2)
+            self.bytes_per_second = self._avg(self.bytes_per_second, nbytes / transfer)
+
+    def record_run(self, nbytes: int, seconds: float) -> None:
+        """Record the bytes and wall time of a whole upload run."""
+        if seconds <= 0 or nbytes < SMALL_REQUEST_BYTES:
+            return
+        with self._lock:
+            self.total_bytes_per_second = self._avg(
+                self.total_bytes_per_second, nbytes / seconds
+            )
+
+    def record_response(self, response: Any) -> None:
+        """Record a ``requests`` response; ignores objects without timing."""
+        elapsed = getattr(response, "elapsed", None)
+        request = getattr(response, "request", None)
+        if elapsed is None or request is None:
+            return
+        body = getattr(request, "body", None) or b""
+        size = len(body) if isinstance(body, (bytes, str)) else 0
+        self.record(size, elapsed.total_seconds())
+
+    def request_time(self, nbytes: int = 0) -> float:
+        latency = self.request_seconds or DEFAULT_REQUEST_SECONDS
+        throughput = self.bytes_per_second or DEFAULT_BYTES_PER_SECOND
+        return latency + nbytes / throughput
+
+    def total_throughput(self) -> float:
+        """Bandwidth shared by parallel uploads; one connection's until measured."""
+        return (
+            self.total_bytes_per_second
+            or self.bytes_per_second
+            or DEFAULT_BYTES_PER_SECOND
+        )
+
+    def to_dict(self) -> Dict[str, Optional[float]]:
+        return {
+            "bytes_per_second": self.bytes_per_second,
+            "request_seconds": self.request_seconds,
+            "total_bytes_per_second": self.total_bytes_per_second,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "ThroughputMeter":
+        data = data or {}
+        return cls(
+            data.get("bytes_per_second"),
+            data.get("request_seconds"),
+            data.get("total_bytes_per_second"),
+        )
+
+
+@dataclass(frozen=True)
+class PlannedCall:
+    """One API request that ``upload_release`` would make."""
+
+    step: str
+    method: str
+    path: str
+    bytes: int = 0
+    track: str = ""
+
+
+def file_size(f: Any) -> int:
+    """Return the size of an uploaded file or a path on disk."""
+    if f is None:
+        return 0
+    if isinstance(f, (str, Path)):
+        return Path(f).stat().st_size
+    size = getattr(f, "size", None)
+    if size is not None:
+        return int(size)
+    return len(f.getvalue())
+
+
+def plan_release(
+    name: str,
+    release: Dict[str, Any],
+    settings: Dict[str, Dict[str, Any]],
+    config: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Return the requests ``upload_release`` would make, without sending them.
+
+    ``problems`` stop the release from being uploaded; ``warnings`` do not.
+    """
+    tracks = release["tracks"]
+    options = release.get("options", {})
+    artist, title, version = release_identity(name, release, settings)
+    plan: Dict[str, Any] = {
+        "name": name,
+        "artist": artist,
+        "title": title,
+        "type": release_type(len(tracks), options.get("release_type")),
+        "calls": [],
+        "problems": [],
+        "warnings": [],
+    }
+    calls: List[PlannedCall] = plan["calls"]
+    if artist not in config.get("artists", {}):
+        plan["problems"].append(f"Нет artist_id для '{artist}'")
+        return plan
+    preset = config.get("presets", {}).get(artist)
+    if preset is None:
+        plan["problems"].append(f"Нет пресета для '{artist}'")
+        return plan
+
+    calls.append(PlannedCall("create", "POST", "/releases/create"))
+    for t in tracks[1:]:
+        calls.append(
+            PlannedCall("add_track", "POST", "/releases/{id}/tracks", track=t["stem"])
+        )
+    calls.append(PlannedCall("metadata", "PUT", "/releases/{id}"))
+    label_id = options.get("label_id") or preset.get("label_id")
+    if label_id:
+        if label_id not in config.get("labels", {}).values():
+            plan["warnings"].append(f"Лейбл {label_id} не найден в конфиге")
+        calls.append(PlannedCall("label", "PUT", "/releases/{id}"))
+    cover = release.get("cover")
+    if cover is not None:
+        calls.append(
+            PlannedCall("cover", "POST", "/releases/{id}/cover", file_size(cover))
+        )
+    else:
+        plan["warnings"].append("Нет обложки")
+    with_audio = [t for t in tracks if t.get("audio") is not None]
+    for t in with_audio:
+        calls.append(
+            PlannedCall(
+                "audio",
+                "POST",
+                "/releases/{id}/tracks/{trackId}/upload",
+                file_size(t["audio"]),
+                t["stem"],
+            )
+        )
+    if not with_audio:
+        plan["warnings"].append("Нет аудио")
+    for t in with_audio:
+        opts = settings.get(t["stem"], {})
+        if not (opts.get("composers") or preset.get("composers")) or not (
+            opts.get("lyricists") or preset.get("lyricists")
+        ):
+            plan["warnings"].append(f"Нет композиторов/авторов текста: {t['stem']}")
+        calls.append(
+            PlannedCall(
+                "tracks", "PUT", "/releases/{id}/tracks/{trackId}", track=t["stem"]
+            )
+        )
+    if not (options.get("platforms") or config.get("streaming_platforms")):
+        plan["warnings"].append("Не выбраны площадки")
+    calls.append(PlannedCall("platforms", "PUT", "/releases/{id}"))
+    return plan
+
+
+def _makespan(durations: Iterable[float], workers: int) -> float:
+    """Finish time of FIFO jobs on ``workers`` parallel slots."""
+    slots = [0.0] * max(1, workers)
+    for d in durations:
+        start = heapq.heappop(slots)
+        heapq.heappush(slots, start + d)
+    return max(slots)
+
+
+def estimate_release(
+    plan: Dict[str, Any], meter: ThroughputMeter, track_workers: int
+) -> float:
+    """Estimated seconds for one release; audio goes in parallel."""
+    calls = plan["calls"]
+    sequential = sum(meter.request_time(c.bytes) for c in calls if c.step != "audio")
+    audio = [meter.request_time(c.bytes) for c in calls if c.step == "audio"]
+    return sequential + _makespan(audio, track_workers)
+
+
+def summarize(
+    plans: List[Dict[str, Any]],
+    meter: ThroughputMeter,
+    workers: int,
+    track_workers: int,
+) -> Dict[str, Any]:
+    """Totals and estimated wall-clock time for a batch of release plans.
+
+    More workers only overlap request latency: the time can't be shorter
+    than sending all bytes at :meth:`ThroughputMeter.total_throughput`.
+    """
+    durations = [estimate_release(p, meter, track_workers) for p in plans]
+    nbytes = sum(c.bytes for p in plans for c in p["calls"])
+    parallel = _makespan(durations, workers)
+    transfer = nbytes / meter.total_throughput()
+    return {
+        "releases": len(plans),
+        "blocked": sum(1 for p in plans if p["problems"]),
+        "requests": sum(len(p["calls"]) for p in plans),
+        "bytes": nbytes,
+        "seconds": max(parallel, transfer),
+        "bandwidth_limited": transfer > parallel,
+        "measured": meter.measured,
+    }
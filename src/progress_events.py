@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import queue
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Event statuses
+QUEUED = "queued"
+STARTED = "started"
+DONE = "done"
+FAILED = "failed"
+WARNING = "warning"
+
+# Step that describes the release as a whole
+RELEASE_STEP = "release"
+
+# Labels for Russian UI
+STEP_LABELS: Dict[str, str] = {
+    "release": "Релиз",
+    "create": "Создание черновика",
+    "add_track": "Добавление трека",
+    "metadata": "Метаданные релиза",
+    "label": "Лейбл",
+    "cover": "Обложка",
+    "audio": "Аудио",
+    "tracks": "Метаданные треков",
+    "platforms": "Площадки",
+}
+STATUS_ICONS: Dict[str, str] = {
+    QUEUED: "🕓",
+    STARTED: "⏳",
+    DONE: "✅",
+    FAILED: "❌",
+    WARNING: "⚠️",
+}
+
+
+@dataclass(frozen=True)
+class UploadEvent:
+    """Single progress event emitted by an upload worker."""
+
+    release: str
+    step: str
+    status: str
+    message: str = ""
+    release_id: Optional[int] = None
+    track: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def format(self) -> str:
+        """Return a one-line text representation for CLI output."""
+        icon = STATUS_ICONS.get(self.status, "")
+        step = STEP_LABELS.get(self.step, self.step)
+        if self.track:
+            step = f"{step} ({self.track})"
+        rid = f" [{self.release_id}]" if self.release_id else ""
+        msg = f": {self.message}" if self.message else ""
+        return f"{icon} {self.release}{rid} · {step}{msg}"
+
+
+class EventBus:
+    """Thread-safe queue of upload events.
+
+    Workers call :meth:`emit`; the main thread periodically calls
+    :meth:`drain` and renders the collected events.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.SimpleQueue[UploadEvent]" = queue.SimpleQueue()
+
+    def emit(
+        self,
+        release: str,
+        step: str,
+        status: str,
+        message: str = "",
+        release_id: Optional[int] = None,
+        track: str = "",
+    ) -> UploadEvent:
+        event = UploadEvent(release, step, status, message, release_id, track)
+        self._queue.put(event)
+        return event
+
+    def drain(self, limit: Optional[int] = None) -> List[UploadEvent]:
+        """Return queued events without blocking."""
+        events: List[UploadEvent] = []
+        while limit is None or len(events) < limit:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+
+class ProgressTracker:
+    """Aggregate events into per-release state for rendering."""
+
+    def __init__(self, releases: Optional[List[str]] = None) -> None:
+        self.releases: Dict[str, Dict[str, Any]] = {}
+        self.in_flight: Dict[Tuple[str, str, str], UploadEvent] = {}
+        self.errors: List[UploadEvent] = []
+        for name in releases or []:
+            self._row(name)
+
+    def _row(self, release: str) -> Dict[str, Any]:
+        return self.releases.setdefault(
+            release,
+            {
+                "Релиз": release,
+                "ID": None,
+                "Статус": STATUS_ICONS[QUEUED],
+                "Шаг": "",
+                "Ошибки": 0,
+                "Сообщение": "",
+            },
+        )
+
+    def apply(self, events: List[UploadEvent]) -> None:
+        for ev in events:
+            row = self._row(ev.release)
+            if ev.release_id:
+                row["ID"] = ev.release_id
+            key = (ev.release, ev.step, ev.track)
+            if ev.status == STARTED:
+                self.in_flight[key] = ev
+            elif ev.status in (DONE, FAILED):
+                self.in_flight.pop(key, None)
+            if ev.status in (FAILED, WARNING):
+                self.errors.append(ev)
+                if ev.status == FAILED:
+                    row["Ошибки"] += 1
+            if ev.step == RELEASE_STEP:
+                row["Статус"] = STATUS_ICONS.get(ev.status, row["Статус"])
+                if ev.status in (DONE, FAILED):
+                    # Steps left open by an aborted worker are no longer running
+                    for k in [k for k in self.in_flight if k[0] == ev.release]:
+                        del self.in_flight[k]
+            else:
+                row["Шаг"] = STEP_LABELS.get(ev.step, ev.step)
+            if ev.message:
+                row["Сообщение"] = ev.message
+
+    @property
+    def finished(self) -> int:
+        icons = (STATUS_ICONS[DONE], STATUS_ICONS[FAILED])
+        return sum(1 for r in self.releases.values() if r["Статус"] in icons)
+
+    def status_rows(self) -> List[Dict[str, Any]]:
+        return list(self.releases.values())
+
+    def in_flight_rows(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        return [
+            {
+                "Релиз": ev.release,
+                "Шаг": STEP_LABELS.get(ev.step, ev.step),
+                "Трек": ev.track,
+                "Секунд": round(now - ev.timestamp, 1),
+            }
+            for ev in self.in_flight.values()
+            if ev.step != RELEASE_STEP
+        ]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+from src.musicalligator_client import MusicAlligatorClient
+
+# Reference lists used by the main page and the manifest check
+REFERENCE_PATHS: Dict[str, str] = {
+    "artists": "/artists?name=",
+    "labels": "/labels?_status=READY&level=REGULAR&skip=0&limit=100",
+    "persons": "/persons?name=",
+    "platforms": "/platform/platforms/streaming",
+}
+
+
+def _items(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    data = payload.get("data", [])
+    # Paginated endpoints wrap the list into another "data" object
+    if isinstance(data, dict):
+        data = data.get("data", [])
+    return data
+
+
+class ReferenceDataError(RuntimeError):
+    """Some reference lists could not be fetched; carries the partial data."""
+
+    def __init__(self, data: Dict[str, Dict[str, int]], failed: List[str]) -> None:
+        super().__init__("Не удалось загрузить: " + ", ".join(failed))
+        self.data = data
+        self.failed = failed
+
+
+def fetch_reference(client: MusicAlligatorClient, path: str) -> Dict[str, int]:
+    """Return mapping of name -> id for one reference list.
+
+    Runs in worker threads, so it uses its own session and never calls
+    Streamlit (``client.get`` reports errors with ``st.toast``).
+    """
+    r = client.clone_session().get(client._url(path))
+    r.raise_for_status()
+    return {item["name"]: item["id"] for item in _items(r.json())}
+
+
+def fetch_reference_data(
+    client: MusicAlligatorClient, paths: Dict[str, str] = REFERENCE_PATHS
+) -> Tuple[Dict[str, Dict[str, int]], List[str]]:
+    """Fetch all reference lists concurrently.
+
+    Returns the data (empty mapping for a failed list) and the names of the
+    lists that could not be fetched.
+    """
+    data: Dict[str, Dict[str, int]] = {}
+    failed: List[str] = []
+    with ThreadPoolExecutor(max_workers=len(paths)) as exe:
+        futures = {
+            kind: exe.submit(fetch_reference, client, p) for kind, p in paths.items()
+        }
+        for kind, fut in futures.items():
+            try:
+                data[kind] = fut.result()
+            except Exception:  # noqa: BLE001
+                data[kind] = {}
+                failed.append(kind)
+    return data, failed
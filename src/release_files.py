@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import re
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+VERSION_RE = re.compile(r"\(([^()]*)\)\s*$")
+# Leading 1-2 digit track number followed by a separator or a space:
+# "01. ", "02 - ", "3_", "4)" or "05 ". Longer numbers ("2024 Remaster
+# Song") are part of the title.
+TRACK_NUMBER_RE = re.compile(r"^(\d{1,2})(?:\s*[.)_-]\s*|\s+)")
+# Release types accepted by POST /releases/create
+RELEASE_TYPES = ["SINGLE", "EP", "ALBUM"]
+
+# "Artist - Release [01] Track Title (Version)"
+DEFAULT_GROUP_PATTERN = r"^(?P<release>.+?)\s*\[(?P<number>\d+)\]\s*(?P<title>.+)$"
+
+# Columns of the batch settings table that are copied by bulk actions
+BULK_COLUMNS = ["explicit", "track_date"]
+
+
+def parse_stem(stem: str) -> Tuple[str, str, str]:
+    """Split ``"Artist - Title (Version)"`` into artist, title and version."""
+    if " - " in stem:
+        artist, title = stem.split(" - ", 1)
+    else:
+        artist, title = "", stem
+    version = ""
+    m = VERSION_RE.search(title)
+    if m:
+        version = m.group(1).strip()
+        title = title[: m.start()].rstrip()
+    return artist.strip(), title.strip(), version
+
+
+def compile_group_pattern(pattern: str) -> re.Pattern[str]:
+    """Compile a grouping pattern; it must define a ``release`` group."""
+    try:
+        regex = re.compile(pattern)
+    except re.error as exc:
+        raise ValueError(f"Некорректный шаблон: {exc}") from exc
+    if "release" not in regex.groupindex:
+        raise ValueError("В шаблоне нет группы (?P<release>...)")
+    return regex
+
+
+def release_key(
+    stem: str, pattern: Optional[re.Pattern[str]] = None
+) -> Tuple[str, Optional[int]]:
+    """Return the release name and track number for a file stem."""
+    m = pattern.match(stem) if pattern else None
+    if not m:
+        return stem, None
+    number = m.groupdict().get("number")
+    return m.group("release").strip(), int(number) if number else None
+
+
+def parse_track(
+    stem: str, release: Optional[str] = None, pattern: Optional[re.Pattern[str]] = None
+) -> Tuple[str, str, str]:
+    """Return artist, title and version of a track inside ``release``.
+
+    Tracks without their own artist inherit it from the release name.
+    """
+    if release is None or release == stem:
+        return parse_stem(stem)
+    m = pattern.match(stem) if pattern else None
+    if m and m.groupdict().get("title"):
+        part = m.group("title")
+    else:
+        part = TRACK_NUMBER_RE.sub("", stem, count=1)
+    artist, title, version = parse_stem(part)
+    return artist or parse_stem(release)[0], title, version
+
+
+def track_number(stem: str) -> Optional[int]:
+    """Leading track number of a file stem, if it has one."""
+    m = TRACK_NUMBER_RE.match(stem)
+    return int(m.group(1)) if m else None
+
+
+def release_type(track_count: int, override: Optional[str] = None) -> str:
+    """Pick the release type by the number of tracks (store rules).
+
+    ``override`` is the type chosen by the user, e.g. a 10-track EP.
+    """
+    if override:
+        return override
+    if track_count <= 3:
+        return "SINGLE"
+    if track_count <= 6:
+        return "EP"
+    return "ALBUM"
+
+
+def release_identity(
+    name: str, release: Dict[str, Any], settings: Dict[str, Dict[str, Any]]
+) -> Tuple[str, str, str]:
+    """Return artist, title and version of a release built by this module.
+
+    A single takes the (possibly edited) values of its only track; other
+    releases are described by their name. Release ``options`` win.
+    """
+    tracks = release["tracks"]
+    first = settings.get(tracks[0]["stem"], {}) if tracks else {}
+    artist, title, version = parse_stem(name)
+    if len(tracks) == 1 and tracks[0]["stem"] == name:
+        artist = first.get("artist", artist)
+        title = first.get("title", title)
+        version = first.get("version", version)
+    else:
+        artist = artist or first.get("artist", "")
+    options = release.get("options", {})
+    artist = options.get("artist") or artist
+    title = options.get("title") or title
+    version = options.get("version", version)
+    return artist, title, version
+
+
+def group_releases(
+    groups: Dict[str, Dict[str, Any]], pattern: Optional[re.Pattern[str]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Combine files grouped by stem into releases.
+
+    Returns ``{name: {"cover": file, "tracks": [{"stem", "audio"}]}}``.
+    Without ``pattern`` every stem is a single. A cover named after the
+    release is preferred over the covers of individual tracks.
+    """
+    releases: Dict[str, Dict[str, Any]] = {}
+    numbers: Dict[str, Optional[int]] = {}
+    for stem, files in sorted(groups.items()):
+        name, number = release_key(stem, pattern)
+        rel = releases.setdefault(name, {"cover": None, "tracks": []})
+        if "cover" in files and (rel["cover"] is None or stem == name):
+            rel["cover"] = files["cover"]
+        rel["tracks"].append({"stem": stem, "audio": files.get("audio")})
+        numbers[stem] = number
+    for rel in releases.values():
+        if any(t["audio"] for t in rel["tracks"]):
+            rel["tracks"] = [t for t in rel["tracks"] if t["audio"]]
+        rel["tracks"].sort(
+            key=lambda t: (
+                numbers[t["stem"]] is None,
+                numbers[t["stem"]] or 0,
+                t["stem"],
+            )
+        )
+    return releases
+
+
+def file_set_key(
+    groups: Dict[str, Dict[str, Any]],
+) -> Tuple[Tuple[str, bool, bool], ...]:
+    """Return a hashable description of the grouped uploads.
+
+    Used as a cache key so that parsing is done once per file set.
+    """
+    return tuple(
+        (base, "cover" in files, "audio" in files)
+        for base, files in sorted(groups.items())
+    )
+
+
+def build_rows(
+    file_set: Iterable[Tuple[str, bool, bool]],
+    track_date: Optional[date] = None,
+    pattern: Optional[re.Pattern[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Return editable settings rows for the batch table."""
+    track_date = track_date or date.today()
+    rows = []
+    for base, has_cover, has_audio in file_set:
+        release = release_key(base, pattern)[0]
+        artist, title, version = parse_track(base, release, pattern)
+        rows.append(
+            {
+                "Файл": base,
+                "Релиз": release,
+                "Артист": artist,
+                "Название": title,
+                "Версия": version,
+                "Обложка": "✅" if has_cover else "⚠️",
+                "Аудио": "✅" if has_audio else "⚠️",
+                "explicit": False,
+                "track_date": track_date,
+                "select": False,
+            }
+        )
+    return rows
+
+
+def fill_down(
+    rows: List[Dict[str, Any]], columns: Iterable[str] = BULK_COLUMNS
+) -> List[Dict[str, Any]]:
+    """Copy values of the first selected row to the selected rows below it.
+
+    When nothing is selected the first row is copied to the whole table.
+    """
+    targets = [i for i, r in enumerate(rows) if r.get("select")] or list(
+        range(len(rows))
+    )
+    if not targets:
+        return rows
+    source = rows[targets[0]]
+    for i in targets[1:]:
+        for col in columns:
+            rows[i][col] = source[col]
+    return rows
+
+
+def apply_to_selection(
+    rows: List[Dict[str, Any]], values: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Set ``values`` on every selected row."""
+    for row in rows:
+        if row.get("select"):
+            row.update(values)
+    return rows
+
+
+def _text(value: Any) -> str:
+    # Empty cells come back from the data editor as None or NaN
+    return value.strip() if isinstance(value, str) else ""
+
+
+def _iso_date(value: Any) -> str:
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and value:
+        return value.split("T")[0].split(" ")[0]
+    return date.today().isoformat()
+
+
+def settings_from_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Convert table rows to per-file upload options."""
+    settings = {}
+    for row in rows:
+        settings[row["Файл"]] = {
+            "artist": _text(row.get("Артист")),
+            "title": _text(row.get("Название")),
+            "version": _text(row.get("Версия")),
+            "explicit": bool(row.get("explicit")),
+            "track_date": _iso_date(row.get("track_date")),
+        }
+    return settings
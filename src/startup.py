@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import time
+from typing import List, Tuple
+
+# Set to any non-empty value to print startup timings for each script run
+PROFILE_ENV = "MASS_ALLIGATOR_PROFILE"
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S.*)$")
+
+
+def profiling_enabled() -> bool:
+    return bool(os.environ.get(PROFILE_ENV))
+
+
+class StartupTimer:
+    """Collect named time marks since the start of a script run."""
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, name: str) -> float:
+        elapsed = time.perf_counter() - self.start
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    def report(self) -> str:
+        parts = [f"{name}: {elapsed * 1000:.0f} мс" for name, elapsed in self.marks]
+        return " · ".join(parts)
+
+    def emit(self) -> None:
+        if profiling_enabled():
+            print(f"[startup] {self.report()}", file=sys.stderr, flush=True)
+
+
+def parse_importtime(output: str, top: int = 20) -> List[Tuple[str, int, int]]:
+    """Parse ``python -X importtime`` output.
+
+    Returns ``(module, cumulative_us, self_us)`` sorted by cumulative time.
+    """
+    rows = []
+    for line in output.splitlines():
+        m = IMPORTTIME_RE.match(line)
+        if m:
+            rows.append((m.group(3).strip(), int(m.group(2)), int(m.group(1))))
+    rows.sort(key=lambda r: r[1], reverse=True)
+    return rows[:top]
@@ -0,0 +1,464 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests  # type: ignore
+
+from src.musicalligator_client import MusicAlligatorClient
+
+# Default location of the local statistics database
+DB_PATH = Path("statistics.sqlite")
+# Requests in flight at the same time
+EXPORT_WORKERS = 4
+PAGE_SIZE = 100
+# Days after the end of a month before its statistics are complete; the API
+# fills in streams with a delay of a week or more
+STREAMS_SETTLE_DAYS = 30
+# Field used to narrow /statistics to one artist. The API does not list it in
+# /statistics/filters, so export_all() checks that it actually takes effect
+ARTIST_FIELD = "id_artist"
+STREAM_AGGS = [{"field": "id_m_list_streaming_platform"}, {"field": "dt_listen"}]
+# Columns that :meth:`StatsStore.stream_totals` can group by
+STREAM_GROUPS = {
+    "artist": "artist_id",
+    "platform": "platform_id",
+    "month": "substr(day, 1, 7)",
+    "day": "day",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS streams (
+    artist_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    platform_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (artist_id, day, platform_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS streams_day ON streams (day);
+CREATE INDEX IF NOT EXISTS streams_platform ON streams (platform_id, day);
+CREATE TABLE IF NOT EXISTS finance_reports (
+    artist_id INTEGER NOT NULL,
+    period_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (artist_id, period_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS finance_reports_period ON finance_reports (period_id);
+CREATE TABLE IF NOT EXISTS transactions (
+    key TEXT PRIMARY KEY,
+    transaction_id TEXT,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    amount REAL NOT NULL,
+    title TEXT NOT NULL,
+    comment TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS transactions_type ON transactions (type, date);
+CREATE TABLE IF NOT EXISTS exports (
+    kind TEXT NOT NULL,
+    artist_id INTEGER NOT NULL,
+    period TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (kind, artist_id, period)
+) WITHOUT ROWID;
+"""
+
+
+def month_ranges(start: date, end: date) -> List[Tuple[date, date]]:
+    """Split ``start``..``end`` (inclusive) into calendar months."""
+    ranges = []
+    current = start
+    while current <= end:
+        next_month = (current.replace(day=1) + timedelta(days=32)).replace(day=1)
+        ranges.append((current, min(next_month - timedelta(days=1), end)))
+        current = next_month
+    return ranges
+
+
+def _period_id(period: Any) -> str:
+    # Report periods are objects in some responses and plain ids in others
+    if isinstance(period, dict):
+        for key in ("periodId", "id", "name"):
+            if period.get(key) is not None:
+                return str(period[key])
+    return str(period)
+
+
+def _data(payload: Dict[str, Any]) -> Any:
+    return payload.get("data", {})
+
+
+def _transaction_key(item: Dict[str, Any], seen: Counter) -> str:
+    """Stable key of a transaction: its id, or its fields plus an ordinal.
+
+    ``seen`` counts the id-less rows met so far in one export, so that two
+    identical transactions get different keys instead of being merged.
+    """
+    if item.get("transactionId") is not None:
+        return f"id:{item['transactionId']}"
+    fields = (
+        item.get("date"),
+        item.get("type"),
+        item.get("amount"),
+        item.get("title"),
+    )
+    base = json.dumps(fields, ensure_ascii=False, default=str)
+    seen[base] += 1
+    return f"{base}#{seen[base]}"
+
+
+class StatsStore:
+    """SQLite database with exported statistics.
+
+    Rows are written page by page as they arrive; ``exports`` records the
+    finished (artist, period) pairs so that repeat exports can skip them.
+    One connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path: Path | str = DB_PATH) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def done(self, kind: str, artist_id: int) -> set:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT period FROM exports WHERE kind = ? AND artist_id = ?",
+                (kind, artist_id),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def mark_done(self, kind: str, artist_id: int, period: str, rows: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO exports VALUES (?, ?, ?, ?, ?)",
+                (kind, artist_id, period, rows, datetime.now().isoformat()),
+            )
+
+    def add_streams(self, artist_id: int, items: Iterable[Dict[str, Any]]) -> int:
+        rows = [
+            (
+                artist_id,
+                str(item["dt_listen"])[:10],
+                int(item["id_m_list_streaming_platform"]),
+                int(item["count"]),
+            )
+            for item in items
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO streams VALUES (?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def add_reports(
+        self, artist_id: int, period_id: str, start: int, items: List[Any]
+    ) -> int:
+        rows = [
+            (artist_id, period_id, start + i, json.dumps(item, ensure_ascii=False))
+            for i, item in enumerate(items)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO finance_reports VALUES (?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def add_transactions(
+        self, items: Iterable[Dict[str, Any]], seen: Optional[Counter] = None
+    ) -> int:
+        """Upsert transactions and return how many were new or changed.
+
+        Pass the same ``seen`` counter for all pages of one export.
+        """
+        seen = Counter() if seen is None else seen
+        rows = [
+            (
+                _transaction_key(item, seen),
+                item.get("transactionId"),
+                str(item.get("date", "")),
+                str(item.get("type", "")),
+                str(item.get("status", "")),
+                float(item.get("amount") or 0),
+                str(item.get("title") or ""),
+                item.get("Comment"),
+            )
+            for item in items
+        ]
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET"
+                " status = excluded.status, comment = excluded.comment"
+                " WHERE status IS NOT excluded.status"
+                " OR comment IS NOT excluded.comment",
+                rows,
+            )
+            return self._conn.total_changes - before
+
+    def stream_totals(
+        self, by: str = "month", artist_ids: Optional[List[int]] = None
+    ) -> List[Tuple[Any, int]]:
+        """Sum of streams grouped by ``artist``, ``platform``, ``month`` or ``day``."""
+        column = STREAM_GROUPS[by]
+        query = f"SELECT {column} AS key, SUM(count) FROM streams"
+        params: List[Any] = []
+        if artist_ids:
+            query += f" WHERE artist_id IN ({', '.join('?' * len(artist_ids))})"
+            params.extend(artist_ids)
+        query += " GROUP BY key ORDER BY key"
+        with self._lock:
+            return self._conn.execute(query, params).fetchall()
+
+    def transaction_totals(self) -> List[Tuple[str, str, float]]:
+        """Sum of transactions grouped by type and status."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT type, status, SUM(amount) FROM transactions"
+                " GROUP BY type, status ORDER BY type, status"
+            ).fetchall()
+
+
+@dataclass(frozen=True)
+class ExportJob:
+    """One request chain of an export; ``final`` jobs are not fetched again."""
+
+    kind: str
+    artist_id: int
+    period: str
+    run: Callable[[], int]
+    final: bool = True
+
+
+@dataclass
+class ExportResult:
+    """Counters of one :func:`export_all` run."""
+
+    requests: int = 0
+    rows: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class StatsExporter:
+    """Export statistics, finance reports and transactions into a store.
+
+    Jobs (one per artist and month or report period) run on a bounded
+    thread pool; each page is written to the store as soon as it arrives.
+    Finished past periods are skipped on later runs; a month is fetched
+    again until ``STREAMS_SETTLE_DAYS`` have passed since its end. Every worker thread talks to the API through its
+    own session from :meth:`MusicAlligatorClient.clone_session`.
+    """
+
+    def __init__(
+        self,
+        client: MusicAlligatorClient,
+        store: StatsStore,
+        workers: int = EXPORT_WORKERS,
+        page_size: int = PAGE_SIZE,
+    ) -> None:
+        self.client = client
+        self.store = store
+        self.workers = workers
+        self.page_size = page_size
+        self._count_lock = threading.Lock()
+        self._local = threading.local()
+        self.requests = 0
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self.client.clone_session()
+        return session
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> Any:
+        with self._count_lock:
+            self.requests += 1
+        r = getattr(self._session(), method)(self.client._url(path), **kwargs)
+        r.raise_for_status()
+        return _data(r.json())
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Any:
+        return self._request("post", path, json=payload)
+
+    def _streams(
+        self, artist_id: int, start: date, end: date, aggs: List[Dict[str, str]]
+    ) -> List[Dict[str, Any]]:
+        items = self._post(
+            "/statistics",
+            {
+                "aggs": aggs,
+                "filters": [{"field": ARTIST_FIELD, "value": [artist_id]}],
+                "dates": [{"from": start.isoformat(), "to": end.isoformat()}],
+            },
+        )
+        return items or []
+
+    def export_streams(self, artist_id: int, start: date, end: date) -> int:
+        items = self._streams(artist_id, start, end, STREAM_AGGS)
+        return self.store.add_streams(artist_id, items)
+
+    def check_artist_filter(
+        self, artist_ids: List[int], start: date, end: date
+    ) -> Optional[str]:
+        """Return an error if ``ARTIST_FIELD`` does not narrow ``/statistics``.
+
+        Totals per platform of two artists are compared; identical non-empty
+        answers mean the API ignored the filter.
+        """
+        if len(artist_ids) < 2:
+            return None
+        aggs = STREAM_AGGS[:1]
+        answers = [
+            sorted(
+                json.dumps(item, sort_keys=True)
+                for item in self._streams(a, start, end, aggs)
+            )
+            for a in artist_ids[:2]
+        ]
+        if answers[0] and answers[0] == answers[1]:
+            return (
+                f"Фильтр {ARTIST_FIELD} не действует: статистика артистов "
+                f"{artist_ids[0]} и {artist_ids[1]} совпадает, прослушивания не выгружены"
+            )
+        return None
+
+    def export_report(self, artist_id: int, period_id: str) -> int:
+        total = 0
+        while True:
+            page = self._post(
+                "/finance/reports",
+                {
+                    "limit": self.page_size,
+                    "skip": total,
+                    "platformIds": [],
+                    "countryIds": [],
+                    "artistIds": [artist_id],
+                    "periodIds": [period_id],
+                },
+            )
+            items = page.get("data", [])
+            total += self.store.add_reports(artist_id, period_id, total, items)
+            if len(items) < self.page_size or total >= page.get("count", 0):
+                return total
+
+    def export_transactions(self) -> int:
+        """Fetch all transactions and return how many were new or changed.
+
+        The status of a transaction changes after it appears, so old pages
+        are read again too; the list is short compared to the statistics.
+        """
+        changed = skip = 0
+        seen: Counter = Counter()
+        while True:
+            page = self._post(
+                "/finance/transactions",
+                {"limit": self.page_size, "skip": skip, "offset": skip},
+            )
+            items = page.get("data", [])
+            changed += self.store.add_transactions(items, seen)
+            skip += len(items)
+            if len(items) < self.page_size or skip >= page.get("count", skip):
+                return changed
+
+    def report_periods(self) -> List[str]:
+        data = self._request("get", "/finance/reports/filters")
+        return [_period_id(p) for p in data.get("periods", [])]
+
+    def jobs(
+        self,
+        artist_ids: List[int],
+        start: date,
+        end: date,
+        periods: List[str],
+    ) -> Tuple[List[ExportJob], int]:
+        """Return pending jobs and the number of skipped finished ones."""
+        today = date.today()
+        jobs: List[ExportJob] = []
+        skipped = 0
+        for artist_id in artist_ids:
+            done = self.store.done("streams", artist_id)
+            for first, last in month_ranges(start, end):
+                period = first.strftime("%Y-%m")
+                if period in done:
+                    skipped += 1
+                    continue
+                run = partial(self.export_streams, artist_id, first, last)
+                # Recent months are still being filled in, fetch them next time too
+                final = last + timedelta(days=STREAMS_SETTLE_DAYS) < today
+                jobs.append(ExportJob("streams", artist_id, period, run, final))
+            done = self.store.done("reports", artist_id)
+            for period in periods:
+                if period in done:
+                    skipped += 1
+                    continue
+                run = partial(self.export_report, artist_id, period)
+                jobs.append(ExportJob("reports", artist_id, period, run))
+        return jobs, skipped
+
+    def export_all(
+        self,
+        artist_ids: List[int],
+        start: date,
+        end: Optional[date] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> ExportResult:
+        """Run all pending jobs; ``on_progress(done, total)`` is called per job."""
+        end = end or date.today()
+        result = ExportResult()
+        try:
+            periods = self.report_periods()
+        except Exception as exc:  # noqa: BLE001
+            periods = []
+            result.errors.append(f"Периоды отчётов: {exc}")
+        jobs, result.skipped = self.jobs(artist_ids, start, end, periods)
+        stream_artists = list(
+            dict.fromkeys(job.artist_id for job in jobs if job.kind == "streams")
+        )
+        try:
+            problem = self.check_artist_filter(stream_artists, start, end)
+        except Exception as exc:  # noqa: BLE001
+            problem = f"Проверка фильтра {ARTIST_FIELD}: {exc}"
+        if problem:
+            # Don't store one artist's numbers under every artist id
+            result.errors.append(problem)
+            jobs = [job for job in jobs if job.kind != "streams"]
+        jobs.append(ExportJob("transactions", 0, "", self.export_transactions, False))
+        total = len(jobs)
+        finished = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as exe:
+            futures = {exe.submit(job.run): job for job in jobs}
+            for fut in as_completed(futures):
+                job = futures[fut]
+                try:
+                    rows = fut.result()
+                    result.rows += rows
+                    if job.final:
+                        self.store.mark_done(job.kind, job.artist_id, job.period, rows)
+                except Exception as exc:  # noqa: BLE001
+                    result.errors.append(
+                        f"{job.kind} {job.artist_id} {job.period}: {exc}"
+                    )
+                finished += 1
+                if on_progress is not None:
+                    on_progress(finished, total)
+        result.requests = self.requests
+        return result
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+from src.musicalligator_client import BASE_URL
+
+NOTIFICATION_TYPE = "RELEASE_STATUS_CHANGE"
+ERROR_STATUS = "ERROR"
+# Statuses that can still change without the user doing anything
+IN_FLIGHT_STATUSES = {"MODERATE", "WAITING", "PROCESSED", "UPLOADED", "EDIT"}
+
+
+@dataclass(frozen=True)
+class StatusChange:
+    """Status transition of one tracked release."""
+
+    release_id: int
+    title: str
+    old: str
+    new: str
+    messages: List[Any] = field(default_factory=list)
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def is_error(self) -> bool:
+        return self.new == ERROR_STATUS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "": "❗" if self.is_error else "",
+            "Время": time.strftime("%H:%M:%S", time.localtime(self.timestamp)),
+            "ID": self.release_id,
+            "Название": self.title,
+            "Было": self.old,
+            "Стало": self.new,
+        }
+
+
+class ReleaseStatusTracker:
+    """Follow release statuses through ``/notifications``.
+
+    The first poll only records the newest notification; later polls read
+    only the notifications newer than the last one seen. ``/releases/{id}``
+    is requested only for tracked releases whose status in a notification
+    differs from the cached one; if that request fails, the release is
+    retried on the next poll. If more than ``max_pages`` pages of
+    notifications arrived since the last poll, the older ones are out of
+    reach, so every in-flight release is fetched again instead. The poll
+    interval starts at ``min_interval``
+    and grows by ``backoff`` while nothing changes, up to ``max_interval``;
+    it drops back after a change. With no in-flight releases the tracker
+    polls at ``max_interval``.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        base_url: str = BASE_URL,
+        min_interval: float = 15.0,
+        max_interval: float = 300.0,
+        backoff: float = 2.0,
+        page_size: int = 50,
+        max_pages: int = 5,
+        on_change: Optional[Callable[[StatusChange], None]] = None,
+    ) -> None:
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.on_change = on_change
+        self.interval = min_interval
+        self.requests = 0
+        self.last_error = ""
+        self.last_poll: Optional[float] = None
+        self.releases: Dict[int, Dict[str, Any]] = {}
+        self.changes: Deque[StatusChange] = deque(maxlen=200)
+        self.change_count = 0
+        self._last_notification: Optional[int] = None
+        # Notified releases whose details could not be fetched yet
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        # Set when the last poll could not reach the last known notification
+        self._overflow = False
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def track(self, releases: Iterable[Dict[str, Any]]) -> None:
+        """Add releases (as returned by the API) to the local cache."""
+        with self._lock:
+            for release in releases:
+                rid = release.get("releaseId")
+                if rid is not None:
+                    self.releases[int(rid)] = dict(release)
+        self._wake.set()
+
+    def set_status(self, release_id: int, status: str) -> None:
+        """Record a status set by this app, e.g. after sending to moderation."""
+        with self._lock:
+            self.releases.setdefault(release_id, {"releaseId": release_id})
+            self.releases[release_id]["status"] = status
+        self._wake.set()
+
+    def status(self, release_id: int) -> Optional[str]:
+        with self._lock:
+            return self.releases.get(release_id, {}).get("status")
+
+    def in_flight(self) -> List[int]:
+        with self._lock:
+            return [
+                rid
+                for rid, r in self.releases.items()
+                if r.get("status") in IN_FLIGHT_STATUSES
+            ]
+
+    def errors(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                dict(r)
+                for r in self.releases.values()
+                if r.get("status") == ERROR_STATUS
+            ]
+
+    def _get(self, path: str, **kwargs: Any) -> Dict[str, Any]:
+        self.requests += 1
+        r = self.session.get(f"{self.base_url}{path}", **kwargs)
+        r.raise_for_status()
+        return r.json().get("data") or {}
+
+    def _new_notifications(self) -> List[Dict[str, Any]]:
+        """Notifications newer than the last poll, oldest first."""
+        if self._last_notification is None:
+            # First poll: only remember where the feed ends, the tracked
+            # releases already carry their current status
+            data = self._get("/notifications", params={"limit": 1, "skip": 0})
+            items = data.get("data", [])
+            self._last_notification = items[0].get("id", 0) if items else 0
+            return []
+        last = self._last_notification
+        found: List[Dict[str, Any]] = []
+        first_page: Optional[int] = None
+        for page in range(self.max_pages):
+            data = self._get(
+                "/notifications",
+                params={"limit": self.page_size, "skip": page * self.page_size},
+            )
+            items = data.get("data", [])
+            if not items or items[0].get("id") == first_page:
+                break  # empty or the API ignores paging
+            first_page = items[0].get("id")
+            known = False
+            for item in items:
+                if item.get("id", 0) <= last:
+                    known = True
+                    break
+                found.append(item)
+            if known or len(items) < self.page_size:
+                break
+        else:
+            self._overflow = True
+        if found:
+            newest = max(item.get("id", 0) for item in found)
+            self._last_notification = max(last, newest)
+        found.reverse()
+        return found
+
+    def poll(self) -> List[StatusChange]:
+        """Run one polling cycle and return the new status changes."""
+        self.last_poll = time.time()
+        try:
+            notes = self._new_notifications()
+        except Exception as exc:  # noqa: BLE001
+            self.last_error = str(exc)
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+            return []
+        latest = self._pending
+        self._pending = {}
+        if self._overflow:
+            # Transitions were lost between pages, check the releases directly
+            latest.update({rid: {"id": rid} for rid in self.in_flight()})
+        for note in notes:
+            if note.get("type") != NOTIFICATION_TYPE:
+                continue
+            release = (note.get("data") or {}).get("release") or {}
+            if release.get("id") is not None:
+                latest[int(release["id"])] = release
+        changes: List[StatusChange] = []
+        self.last_error = ""
+        if self._overflow:
+            self._overflow = False
+            self.last_error = (
+                f"Новых уведомлений больше {self.max_pages * self.page_size}, "
+                "статусы релизов в работе перепроверены"
+            )
+        for rid, note in latest.items():
+            with self._lock:
+                cached = self.releases.get(rid)
+            if cached is None or cached.get("status") == note.get("status"):
+                continue
+            try:
+                fresh = self._get(f"/releases/{rid}")
+            except Exception as exc:  # noqa: BLE001
+                # Don't trust the notification alone, retry on the next poll
+                self.last_error = str(exc)
+                self._pending[rid] = note
+                continue
+            new = fresh.get("status") or note.get("status", "")
+            with self._lock:
+                old = cached.get("status", "")
+                cached.update(fresh)
+                cached["status"] = new
+            if new == old:
+                continue
+            change = StatusChange(
+                rid,
+                cached.get("title") or note.get("title", ""),
+                old,
+                new,
+                list(note.get("messages") or []),
+            )
+            changes.append(change)
+            self.changes.append(change)
+            self.change_count += 1
+            if self.on_change is not None:
+                self.on_change(change)
+        if not self.in_flight():
+            self.interval = self.max_interval
+        elif changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return changes
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.poll()
+            self._wake.wait(self.interval)
+            if self._wake.is_set() and not self._stop.is_set():
+                # New releases were tracked, check them soon
+                self.interval = self.min_interval
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="release-status", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,73 @@
+"""Fake API objects shared by the tests."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests  # type: ignore
+
+from src.musicalligator_client import BASE_URL
+
+# handler(method, path, params or JSON body) -> "data" of the response
+Handler = Callable[[str, str, Dict[str, Any]], Any]
+
+
+class FakeResponse:
+    def __init__(self, data: Any, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self._data = data
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}")
+
+    def json(self) -> Dict[str, Any]:
+        return {"data": self._data}
+
+
+class FakeSession:
+    """Session that routes requests to ``handler`` and logs them."""
+
+    def __init__(
+        self, handler: Handler, calls: Optional[List[Tuple[str, str]]] = None
+    ) -> None:
+        self.handler = handler
+        self.calls = [] if calls is None else calls
+        self.threads: set = set()
+
+    def _request(self, method: str, url: str, payload: Any) -> FakeResponse:
+        path = url.split("/api", 1)[1]
+        self.calls.append((method, path))
+        self.threads.add(threading.get_ident())
+        data = self.handler(method, path, payload or {})
+        return data if isinstance(data, FakeResponse) else FakeResponse(data)
+
+    def get(self, url: str, params: Any = None, **kwargs: Any) -> FakeResponse:
+        return self._request("GET", url, params)
+
+    def post(self, url: str, json: Any = None, **kwargs: Any) -> FakeResponse:
+        return self._request("POST", url, json)
+
+
+class FakeClient:
+    """Stand-in for ``MusicAlligatorClient``; clones share one call log."""
+
+    def __init__(self, handler: Handler) -> None:
+        self.base_url = BASE_URL
+        self.handler = handler
+        self.calls: List[Tuple[str, str]] = []
+        self.sessions: List[FakeSession] = []
+
+    def _url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def clone_session(self) -> FakeSession:
+        session = FakeSession(self.handler, self.calls)
+        self.sessions.append(session)
+        return session
+
+    def get(self, path: str, **kwargs: Any) -> Any:
+        raise AssertionError("worker code must use clone_session()")
+
+    post = get
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+import src.config_store as module
+from src.config_store import (
+    DEFAULT_CONFIG,
+    ConfigError,
+    ConfigStore,
+    get_store,
+    validate_config,
+)
+
+
+def valid_config() -> Dict[str, Any]:
+    return {
+        "auth_token": "t",
+        "artists": {"Artist": 1},
+        "labels": {"Label": 5},
+        "presets": {
+            "Artist": {
+                "label_id": 5,
+                "genre_id": 3,
+                "recording_year": 2024,
+                "language_id": 7,
+                "composers": [10],
+                "lyricists": [11],
+            }
+        },
+        "streaming_platforms": [195, 196],
+    }
+
+
+def test_validate_config_accepts_valid_and_empty_sections() -> None:
+    assert validate_config(valid_config()) == []
+    assert validate_config({"artists": None, "presets": None}) == []
+
+
+def test_validate_config_reports_each_problem() -> None:
+    cfg = valid_config()
+    cfg["artists"]["Other"] = "x"
+    cfg["labels"] = ["Label"]
+    cfg["streaming_platforms"] = "195"
+    cfg["presets"]["Artist"]["genre_id"] = "rock"
+    cfg["presets"]["Artist"]["composers"] = [True]
+    problems = validate_config(cfg)
+    assert len(problems) == 5
+    assert any("artists.Other" in p for p in problems)
+
+
+def test_load_returns_defaults_without_file(tmp_path: Path) -> None:
+    store = ConfigStore(tmp_path / "config.yaml", DEFAULT_CONFIG)
+    cfg = store.load()
+    assert cfg == DEFAULT_CONFIG
+    cfg["artists"]["X"] = 1
+    assert store.load()["artists"] == {}
+
+
+def test_load_parses_only_when_file_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "config.yaml"
+    store = ConfigStore(path, validator=validate_config)
+    store.save(valid_config())
+    calls: List[int] = []
+    real = module.yaml.safe_load
+
+    def counting_load(stream: Any) -> Any:
+        calls.append(1)
+        return real(stream)
+
+    monkeypatch.setattr(module.yaml, "safe_load", counting_load)
+    store.load()
+    store.load()
+    assert calls == []
+
+    path.write_text("auth_token: new\n", encoding="utf-8")
+    assert store.load() == {"auth_token": "new"}
+    assert calls == [1]
+
+
+def test_save_skips_unchanged_content(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    store = ConfigStore(path)
+    assert store.save({"a": 1}) is True
+    mtime = path.stat().st_mtime_ns
+    assert store.save({"a": 1}) is False
+    assert path.stat().st_mtime_ns == mtime
+    assert store.save({"a": 2}) is True
+    assert ConfigStore(path).load() == {"a": 2}
+
+
+def test_save_is_atomic_and_leaves_no_temp_files(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    store = ConfigStore(path)
+    threads = [
+        threading.Thread(target=store.save, args=({"n": n, "text": "x" * 1000},))
+        for n in range(20)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert set(ConfigStore(path).load()) == {"n", "text"}
+    assert [p.name for p in tmp_path.iterdir()] == ["config.yaml"]
+
+
+def test_invalid_file_raises_config_error(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    path.write_text("artists: [1, 2]\n", encoding="utf-8")
+    with pytest.raises(ConfigError) as exc:
+        ConfigStore(path, validator=validate_config).load()
+    assert exc.value.problems
+
+    path.write_text("artists: {a: [\n", encoding="utf-8")
+    with pytest.raises(ConfigError):
+        ConfigStore(path).load()
+
+
+def test_save_rejects_invalid_config(tmp_path: Path) -> None:
+    store = ConfigStore(tmp_path / "config.yaml", validator=validate_config)
+    with pytest.raises(ConfigError):
+        store.save({"streaming_platforms": ["a"]})
+    assert not store.exists()
+
+
+def test_get_store_shares_instance_per_path(tmp_path: Path) -> None:
+    assert get_store(tmp_path / "a.yaml") is get_store(str(tmp_path / "a.yaml"))
+    assert get_store(tmp_path / "a.yaml") is not get_store(tmp_path / "b.yaml")
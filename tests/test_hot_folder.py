@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from src.hot_folder import HotFolderWatcher
+
+
+def _watcher(folder: Path) -> HotFolderWatcher:
+    return HotFolderWatcher(folder, lambda name, release: None, settle_seconds=2)
+
+
+def test_pair_reported_after_settle(tmp_path: Path) -> None:
+    watcher = _watcher(tmp_path)
+    (tmp_path / "A - Song.wav").write_bytes(b"RIFF")
+    (tmp_path / "A - Song.png").write_bytes(b"PNG")
+    assert watcher.scan(now=0) == []
+    assert watcher.scan(now=1) == []
+    pairs = watcher.scan(now=2.5)
+    assert [name for name, _ in pairs] == ["A - Song"]
+    assert pairs[0][1]["tracks"][0]["audio"].name == "A - Song.wav"
+    # reported only once
+    assert watcher.scan(now=10) == []
+
+
+def test_growing_file_and_missing_partner(tmp_path: Path) -> None:
+    watcher = _watcher(tmp_path)
+    wav = tmp_path / "B - Track.wav"
+    wav.write_bytes(b"R")
+    watcher.scan(now=0)
+    wav.write_bytes(b"RIFF....")
+    assert watcher.scan(now=3) == []
+    assert watcher.scan(now=6) == []  # partner still missing
+    (tmp_path / "B - Track.PNG").write_bytes(b"PNG")
+    watcher.scan(now=6)
+    assert [name for name, _ in watcher.scan(now=9)] == ["B - Track"]
+
+
+def test_uploaded_releases_survive_restart(tmp_path: Path) -> None:
+    for stem in ("Old", "Failed"):
+        (tmp_path / f"{stem}.wav").write_bytes(b"RIFF")
+        (tmp_path / f"{stem}.png").write_bytes(b"PNG")
+    watcher = _watcher(tmp_path)
+    watcher.scan(now=0)
+    found = dict(watcher.scan(now=5))
+    assert sorted(found) == ["Failed", "Old"]
+    watcher.mark_uploaded(found["Old"]["key"], 42)
+    assert watcher.uploaded() == {"file/Old": 42}
+
+    # After a restart only the release that was not uploaded comes back,
+    # together with a pair that arrived in the meantime
+    (tmp_path / "New.wav").write_bytes(b"RIFF")
+    (tmp_path / "New.png").write_bytes(b"PNG")
+    restarted = _watcher(tmp_path)
+    restarted.scan(now=0)
+    assert [name for name, _ in restarted.scan(now=5)] == ["Failed", "New"]
+
+
+def test_folder_release(tmp_path: Path) -> None:
+    album = tmp_path / "A - Album"
+    album.mkdir()
+    for name in ("02 Second.wav", "01 First.wav", "cover.png", "01 First.png"):
+        (album / name).write_bytes(b"data")
+    watcher = _watcher(tmp_path)
+    watcher.scan(now=0)
+    (album / "03 Third.wav").write_bytes(b"")  # still being copied
+    assert watcher.scan(now=5) == []
+    (album / "03 Third.wav").write_bytes(b"data")
+    watcher.scan(now=5)
+    assert watcher.scan(now=8) == []  # folder not quiet long enough yet
+    (album / ".ready").write_bytes(b"")
+    [(name, release)] = watcher.scan(now=8)
+    assert name == "A - Album"
+    assert release["cover"].name == "cover.png"
+    assert [t["stem"] for t in release["tracks"]] == [
+        "01 First",
+        "02 Second",
+        "03 Third",
+    ]
+
+
+def test_folder_copied_in_batches_waits_for_quiet_period(tmp_path: Path) -> None:
+    album = tmp_path / "A - Album"
+    album.mkdir()
+    (album / "01 First.wav").write_bytes(b"data")
+    (album / "cover.png").write_bytes(b"data")
+    watcher = HotFolderWatcher(
+        tmp_path, lambda name, release: None, settle_seconds=2, folder_settle_seconds=20
+    )
+    watcher.scan(now=0)
+    assert watcher.scan(now=15) == []
+    (album / "02 Second.wav").write_bytes(b"data")  # second batch
+    watcher.scan(now=15)
+    assert watcher.scan(now=30) == []
+    [(_, release)] = watcher.scan(now=35)
+    assert len(release["tracks"]) == 2
+
+
+def test_folder_tracks_sorted_by_number(tmp_path: Path) -> None:
+    album = tmp_path / "A - Album"
+    album.mkdir()
+    for name in ("10 Ten.wav", "2 Two.wav", "Bonus.wav", "cover.png", ".ready"):
+        (album / name).write_bytes(b"data")
+    watcher = _watcher(tmp_path)
+    watcher.scan(now=0)
+    [(_, release)] = watcher.scan(now=5)
+    assert [t["stem"] for t in release["tracks"]] == ["2 Two", "10 Ten", "Bonus"]
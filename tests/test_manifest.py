@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from src.manifest import (
+    References,
+    load_manifest,
+    manifest_releases,
+    validate_manifest,
+)
+
+REFS = References(
+    artists={"Artist": 1},
+    labels={"Label": 5},
+    persons={"Composer": 9},
+    platforms={"Zvuk": 195},
+)
+
+
+def test_load_csv_and_yaml() -> None:
+    csv_rows = load_manifest("file;title\nA - B;Song\n".encode(), "m.csv")
+    assert csv_rows == [{"file": "A - B", "title": "Song"}]
+    yaml_rows = load_manifest(b"tracks:\n  - file: A - B.wav\n", "m.yaml")
+    assert yaml_rows == [{"file": "A - B.wav"}]
+
+
+def test_validate_reports_all_row_errors() -> None:
+    raw = [
+        {"file": "Artist - One.wav", "explicit": "да", "composers": "composer;9"},
+        {"file": "Unknown - Two", "track_date": "2025-02-30", "platforms": "spotify"},
+        {"file": "Artist - One"},
+        {"file": "Artist - Three", "colour": "red"},
+    ]
+    available = {"Artist - One": {"audio": 1}, "Unknown - Two": {"audio": 1}}
+    rows, errors = validate_manifest(raw, REFS, available)
+    assert rows[0]["explicit"] is True
+    assert rows[0]["composers"] == [9, 9]
+    found = {(e.row, e.column) for e in errors}
+    assert found == {
+        (2, "artist"),
+        (2, "track_date"),
+        (2, "platforms"),
+        (3, "file"),
+        (4, "file"),
+        (4, "colour"),
+    }
+
+
+def test_release_values_must_agree() -> None:
+    raw = [
+        {"file": "01. Intro", "release": "Artist - EP", "label": "Label"},
+        {"file": "02 Outro", "release": "Artist - EP", "label": "5", "genre_id": "3"},
+        {"file": "03 Bonus", "release": "Artist - EP", "release_date": "2025-01-01"},
+        {"file": "04 Live", "release": "Artist - EP", "release_date": "2025-01-02"},
+    ]
+    rows, errors = validate_manifest(raw, REFS)
+    assert [(e.row, e.column) for e in errors] == [(4, "release_date")]
+    assert rows[0]["artist"] == "Artist" and rows[0]["title"] == "Intro"
+
+
+def test_manifest_releases() -> None:
+    raw = [
+        {
+            "file": "01 Intro",
+            "release": "Artist - EP",
+            "platforms": "Zvuk",
+            "release_type": "ep",
+        },
+        {"file": "02 Outro", "release": "Artist - EP", "composers": "Composer"},
+        {"file": "Artist - Single", "version": ""},
+    ]
+    rows, errors = validate_manifest(raw, REFS)
+    assert errors == []
+    groups = {
+        "01 Intro": {"audio": "a1"},
+        "02 Outro": {"audio": "a2", "cover": "c2"},
+        "Artist - Single": {"audio": "s", "cover": "sc"},
+    }
+    releases, settings = manifest_releases(rows, groups)
+    ep = releases["Artist - EP"]
+    assert ep["cover"] == "c2"
+    assert [t["audio"] for t in ep["tracks"]] == ["a1", "a2"]
+    assert ep["options"]["platforms"] == [195]
+    assert ep["options"]["release_type"] == "EP"
+    assert settings["02 Outro"]["composers"] == [9]
+    assert releases["Artist - Single"]["options"]["title"] == "Single"
+
+
+def test_release_type_must_be_known() -> None:
+    _, errors = validate_manifest([{"file": "Artist - A", "release_type": "LP"}], REFS)
+    assert [(e.row, e.column) for e in errors] == [(1, "release_type")]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import io
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.planner import ThroughputMeter, file_size, plan_release, summarize
+
+CONFIG = {
+    "artists": {"A": 1},
+    "labels": {"L": 5},
+    "presets": {"A": {"label_id": 5, "composers": [9], "lyricists": []}},
+    "streaming_platforms": [195],
+}
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name: str, size: int) -> None:
+        super().__init__(b"\0" * size)
+        self.name = name
+
+
+def test_plan_matches_upload_calls() -> None:
+    release = {
+        "cover": Upload("A - EP.png", 10),
+        "tracks": [
+            {"stem": "01 One", "audio": Upload("01 One.wav", 1000)},
+            {"stem": "02 Two", "audio": Upload("02 Two.wav", 2000)},
+        ],
+    }
+    plan = plan_release("A - EP", release, {}, CONFIG)
+    assert plan["problems"] == []
+    assert [c.step for c in plan["calls"]] == [
+        "create",
+        "add_track",
+        "metadata",
+        "label",
+        "cover",
+        "audio",
+        "audio",
+        "tracks",
+        "tracks",
+        "platforms",
+    ]
+    assert sum(c.bytes for c in plan["calls"]) == 3010
+    assert len(plan["warnings"]) == 2  # no lyricists on both tracks
+    assert plan["type"] == "SINGLE"
+    release["options"] = {"release_type": "EP"}
+    assert plan_release("A - EP", release, {}, CONFIG)["type"] == "EP"
+
+
+def test_plan_unknown_artist_sends_nothing() -> None:
+    release = {"cover": None, "tracks": [{"stem": "B - Song", "audio": None}]}
+    plan = plan_release("B - Song", release, {}, CONFIG)
+    assert plan["calls"] == []
+    assert plan["problems"]
+
+
+def test_estimate_uses_workers_up_to_the_bandwidth() -> None:
+    meter = ThroughputMeter(bytes_per_second=1000.0, request_seconds=1.0)
+    release = {"cover": None, "tracks": [{"stem": "A - X", "audio": Upload("x", 4000)}]}
+    plans = [plan_release("A - X", release, {}, CONFIG) for _ in range(4)]
+    # create, metadata, label, tracks, platforms = 5 s, audio = 1 + 4 s
+    assert summarize(plans, meter, 1, 4)["seconds"] == pytest.approx(40)
+    assert summarize(plans, meter, 2, 4)["seconds"] == pytest.approx(20)
+    assert summarize(plans, meter, 2, 4)["bytes"] == 16000
+    # 16000 bytes can't go faster than the single measured connection
+    summary = summarize(plans, meter, 4, 4)
+    assert summary["seconds"] == pytest.approx(16)
+    assert summary["bandwidth_limited"]
+    meter.total_bytes_per_second = 4000.0
+    assert summarize(plans, meter, 4, 4)["seconds"] == pytest.approx(10)
+
+
+def test_large_wav_batch_is_bandwidth_bound() -> None:
+    meter = ThroughputMeter(bytes_per_second=1e6, request_seconds=0.5)
+    tracks = [
+        {"stem": f"0{i}. T", "audio": SimpleNamespace(size=100_000_000)}
+        for i in range(1, 5)
+    ]
+    release = {"cover": None, "tracks": tracks}
+    plans = [plan_release("A - EP", release, {}, CONFIG) for _ in range(5)]
+    # 2000 MB at the measured 1 MB/s, however many workers there are
+    assert summarize(plans, meter, 5, 4)["seconds"] >= 2000
+
+
+def test_meter_records_responses() -> None:
+    meter = ThroughputMeter()
+    assert not meter.measured
+    small = SimpleNamespace(
+        elapsed=timedelta(seconds=0.2), request=SimpleNamespace(body=b"{}")
+    )
+    big = SimpleNamespace(
+        elapsed=timedelta(seconds=2.2), request=SimpleNamespace(body=b"x" * 200_000)
+    )
+    meter.record_response(small)
+    meter.record_response(big)
+    meter.record_response(object())
+    assert meter.measured
+    assert meter.request_seconds == pytest.approx(0.2)
+    assert meter.bytes_per_second == pytest.approx(100_000)
+    meter.record_run(3_000_000, 2.0)
+    meter.record_run(100, 0.1)  # too small to say anything about bandwidth
+    assert meter.total_bytes_per_second == pytest.approx(1_500_000)
+    assert ThroughputMeter.from_dict(meter.to_dict()).to_dict() == meter.to_dict()
+
+
+def test_file_size(tmp_path) -> None:
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"abc")
+    assert file_size(path) == 3
+    assert file_size(Upload("a", 5)) == 5
+    assert file_size(None) == 0
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from src.progress_events import (
+    DONE,
+    FAILED,
+    RELEASE_STEP,
+    STARTED,
+    EventBus,
+    ProgressTracker,
+)
+
+
+def test_bus_collects_events_from_threads() -> None:
+    bus = EventBus()
+    threads = [
+        threading.Thread(target=bus.emit, args=(f"r{i}", "create", STARTED))
+        for i in range(20)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(bus.drain(limit=5)) == 5
+    assert len(bus.drain()) == 15
+    assert bus.drain() == []
+
+
+def test_tracker_state() -> None:
+    bus = EventBus()
+    tracker = ProgressTracker(["a", "b"])
+    bus.emit("a", RELEASE_STEP, STARTED)
+    bus.emit("a", "create", STARTED)
+    bus.emit("b", RELEASE_STEP, FAILED, "Нет artist_id")
+    tracker.apply(bus.drain())
+    assert [r["Шаг"] for r in tracker.in_flight_rows()] == ["Создание черновика"]
+    assert tracker.finished == 1
+    assert len(tracker.errors) == 1
+
+    bus.emit("a", "create", DONE, release_id=7)
+    bus.emit("a", "cover", STARTED, release_id=7)
+    bus.emit("a", RELEASE_STEP, DONE, release_id=7)
+    tracker.apply(bus.drain())
+    assert tracker.in_flight_rows() == []
+    assert tracker.finished == 2
+    assert tracker.releases["a"]["ID"] == 7
+
+
+def test_event_serialization() -> None:
+    ev = EventBus().emit("Artist - Song", "audio", FAILED, "HTTP 500", 12)
+    data = json.loads(ev.to_json())
+    assert data["release_id"] == 12 and data["status"] == FAILED
+    assert "Artist - Song [12]" in ev.format()
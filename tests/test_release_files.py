@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+
+from src.release_files import (
+    DEFAULT_GROUP_PATTERN,
+    apply_to_selection,
+    build_rows,
+    compile_group_pattern,
+    file_set_key,
+    fill_down,
+    group_releases,
+    parse_stem,
+    parse_track,
+    release_type,
+    settings_from_rows,
+    track_number,
+)
+
+
+def test_parse_stem() -> None:
+    assert parse_stem("Artist - Title (Remix)") == ("Artist", "Title", "Remix")
+    assert parse_stem("Artist - Title") == ("Artist", "Title", "")
+    assert parse_stem("Title (Live)") == ("", "Title", "Live")
+
+
+def test_file_set_key_sorted() -> None:
+    groups = {"b": {"audio": 1}, "a": {"cover": 1, "audio": 2}}
+    assert file_set_key(groups) == (("a", True, True), ("b", False, True))
+
+
+def test_fill_down_selected_rows() -> None:
+    rows = build_rows(
+        [("A - 1", True, True), ("A - 2", True, True), ("A - 3", True, True)]
+    )
+    rows[0].update(explicit=True, track_date=date(2024, 1, 1), select=True)
+    rows[2]["select"] = True
+    fill_down(rows)
+    assert rows[2]["explicit"] is True
+    assert rows[2]["track_date"] == date(2024, 1, 1)
+    assert rows[1]["explicit"] is False
+
+
+def test_apply_to_selection_and_settings() -> None:
+    rows = build_rows([("A - 1 (Edit)", True, True), ("A - 2", True, False)])
+    rows[1]["select"] = True
+    apply_to_selection(rows, {"explicit": True, "track_date": datetime(2024, 5, 2)})
+    rows[0]["Версия"] = float("nan")
+    settings = settings_from_rows(rows)
+    assert settings["A - 1 (Edit)"]["version"] == ""
+    assert settings["A - 2"] == {
+        "artist": "A",
+        "title": "2",
+        "explicit": True,
+        "version": "",
+        "track_date": "2024-05-02",
+    }
+
+
+def test_group_releases_by_pattern() -> None:
+    regex = compile_group_pattern(DEFAULT_GROUP_PATTERN)
+    groups = {
+        "A - EP [2] Outro": {"audio": "w2"},
+        "A - EP [10] Bonus (Live)": {"audio": "w10"},
+        "A - EP [1] Intro": {"audio": "w1", "cover": "c1"},
+        "A - EP": {"cover": "ep"},
+        "B - Single": {"audio": "wb", "cover": "cb"},
+    }
+    releases = group_releases(groups, regex)
+    assert set(releases) == {"A - EP", "B - Single"}
+    ep = releases["A - EP"]
+    assert ep["cover"] == "ep"
+    assert [t["audio"] for t in ep["tracks"]] == ["w1", "w2", "w10"]
+    assert releases["B - Single"]["tracks"] == [{"stem": "B - Single", "audio": "wb"}]
+    assert parse_track("A - EP [10] Bonus (Live)", "A - EP", regex) == (
+        "A",
+        "Bonus",
+        "Live",
+    )
+
+
+def test_group_pattern_validation_and_types() -> None:
+    with pytest.raises(ValueError):
+        compile_group_pattern(r"^(?P<album>.+)$")
+    with pytest.raises(ValueError):
+        compile_group_pattern(r"(")
+    assert parse_track("03. Song (Edit)", "A - Album") == ("A", "Song", "Edit")
+    assert [release_type(n) for n in (1, 4, 12)] == ["SINGLE", "EP", "ALBUM"]
+    assert release_type(10, "EP") == "EP"
+
+
+def test_track_number_prefix() -> None:
+    assert parse_track("3_Song", "A - Album")[1] == "Song"
+    assert parse_track("02 - Outro", "A - Album")[1] == "Outro"
+    assert parse_track("01 First", "A - Album")[1] == "First"
+    assert parse_track("2024 Remaster Song", "A - Album")[1] == "2024 Remaster Song"
+    assert [track_number(s) for s in ("10 Ten", "2. Two", "2024 Song")] == [
+        10,
+        2,
+        None,
+    ]
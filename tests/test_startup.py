@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from src.reference_data import ReferenceDataError, fetch_reference_data
+from src.startup import StartupTimer, parse_importtime
+from tests.fakes import FakeClient
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      3000 |      50000 | streamlit
+import time:       400 |       9000 |   yaml
+"""
+
+
+def test_parse_importtime() -> None:
+    rows = parse_importtime(IMPORTTIME, top=2)
+    assert rows == [("streamlit", 50000, 3000), ("yaml", 9000, 400)]
+
+
+def test_timer_marks() -> None:
+    timer = StartupTimer()
+    timer.mark("a")
+    timer.mark("b")
+    assert [name for name, _ in timer.marks] == ["a", "b"]
+    assert timer.marks[0][1] <= timer.marks[1][1]
+    assert timer.report().startswith("a: ")
+
+
+REFERENCE_PAYLOADS: Dict[str, Any] = {
+    "/a": [{"name": "A", "id": 1}],
+    "/l": {"data": [{"name": "L", "id": 2}]},
+}
+
+
+def _reference_handler(method: str, path: str, payload: Dict[str, Any]) -> Any:
+    if path not in REFERENCE_PAYLOADS:
+        raise ConnectionError("offline")
+    return REFERENCE_PAYLOADS[path]
+
+
+def test_fetch_reference_data() -> None:
+    client = FakeClient(_reference_handler)
+    data, failed = fetch_reference_data(
+        client, {"artists": "/a", "labels": "/l", "persons": "/p"}  # type: ignore[arg-type]
+    )
+    assert data == {"artists": {"A": 1}, "labels": {"L": 2}, "persons": {}}
+    assert failed == ["persons"]
+    # Each worker gets its own session instead of the shared client
+    assert len(client.sessions) == 3
+
+
+def test_reference_data_error_keeps_partial_data() -> None:
+    exc = ReferenceDataError({"artists": {"A": 1}}, ["labels"])
+    assert exc.data == {"artists": {"A": 1}} and exc.failed == ["labels"]
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.stats_export import (
+    STREAMS_SETTLE_DAYS,
+    StatsExporter,
+    StatsStore,
+    month_ranges,
+)
+from tests.fakes import FakeClient
+
+
+class Api:
+    """Serves statistics, report periods, reports and transactions."""
+
+    def __init__(self, reports: int = 3, transactions: int = 5) -> None:
+        self.filter_works = True
+        self.reports = [{"n": i} for i in range(reports)]
+        self.transactions: List[Dict[str, Any]] = [
+            {
+                "transactionId": i,
+                "date": f"2025-06-0{i + 1}",
+                "type": "PAYOUT",
+                "status": "OK",
+                "amount": 10,
+            }
+            for i in range(transactions)
+        ]
+        self.client = FakeClient(self.handle)
+
+    def count(self, method: str, path: str) -> int:
+        return self.client.calls.count((method, path))
+
+    def handle(self, method: str, path: str, payload: Dict[str, Any]) -> Any:
+        if path == "/finance/reports/filters":
+            return {"periods": [{"periodId": 7}]}
+        if path == "/statistics":
+            day = payload["dates"][0]["from"]
+            artist = payload["filters"][0]["value"][0] if self.filter_works else 1
+            return [
+                {
+                    "count": 2 * artist,
+                    "dt_listen": f"{day} 00:00:00",
+                    "id_m_list_streaming_platform": 196,
+                },
+                {
+                    "count": 3 * artist,
+                    "dt_listen": f"{day} 00:00:00",
+                    "id_m_list_streaming_platform": 197,
+                },
+            ]
+        rows = self.reports if path == "/finance/reports" else self.transactions
+        skip, limit = payload["skip"], payload["limit"]
+        return {"data": rows[skip : skip + limit], "count": len(rows)}
+
+
+def make_exporter(api: Api, store: StatsStore, **kwargs: Any) -> StatsExporter:
+    return StatsExporter(api.client, store, **kwargs)  # type: ignore[arg-type]
+
+
+def test_month_ranges_split_calendar_months() -> None:
+    assert month_ranges(date(2025, 1, 15), date(2025, 3, 2)) == [
+        (date(2025, 1, 15), date(2025, 1, 31)),
+        (date(2025, 2, 1), date(2025, 2, 28)),
+        (date(2025, 3, 1), date(2025, 3, 2)),
+    ]
+
+
+def test_export_writes_pages_and_aggregates(tmp_path: Path) -> None:
+    store = StatsStore(tmp_path / "stats.sqlite")
+    api = Api()
+    exporter = make_exporter(api, store, workers=3, page_size=2)
+    progress: List[Tuple[int, int]] = []
+
+    def on_progress(done: int, total: int) -> None:
+        progress.append((done, total))
+
+    result = exporter.export_all(
+        [1, 2], date(2025, 1, 1), date(2025, 2, 10), on_progress=on_progress
+    )
+    assert result.errors == []
+    assert progress[-1] == (7, 7)  # 2 artists x (2 months + 1 period) + transactions
+    assert store.stream_totals("artist") == [(1, 10), (2, 20)]
+    assert store.stream_totals("platform", [1]) == [(196, 4), (197, 6)]
+    assert store.stream_totals("month") == [("2025-01", 15), ("2025-02", 15)]
+    assert store.transaction_totals() == [("PAYOUT", "OK", 50.0)]
+    # Reports are paged: 3 rows with page size 2
+    assert api.count("POST", "/finance/reports") == 4
+    # 4 monthly requests plus one filter check per artist
+    assert api.count("POST", "/statistics") == 6
+    # Workers never share a session: at most one per thread and the caller
+    assert 1 < len(api.client.sessions) <= 4
+
+
+def test_repeat_export_fetches_only_new_periods(tmp_path: Path) -> None:
+    store = StatsStore(tmp_path / "stats.sqlite")
+    api = Api()
+    make_exporter(api, store, page_size=2).export_all(
+        [1], date(2025, 1, 1), date(2025, 2, 10)
+    )
+    api.client.calls.clear()
+    result = make_exporter(api, store, page_size=2).export_all(
+        [1], date(2025, 1, 1), date(2025, 3, 10)
+    )
+    assert result.skipped == 3
+    assert api.count("POST", "/statistics") == 1
+    assert api.count("POST", "/finance/reports") == 0
+    # Transactions are read in full to pick up status changes
+    assert api.count("POST", "/finance/transactions") == 3
+    assert store.stream_totals("artist") == [(1, 15)]
+
+
+def test_transactions_update_status_and_keep_duplicates(tmp_path: Path) -> None:
+    store = StatsStore(tmp_path / "stats.sqlite")
+    api = Api(transactions=2)
+    twin = {"date": "2025-07-01", "type": "PAYOUT", "status": "NEW", "amount": 5}
+    api.transactions += [dict(twin), dict(twin)]
+    exporter = make_exporter(api, store, page_size=3)
+    assert exporter.export_transactions() == 4
+
+    api.transactions[0]["status"] = "REJECTED"
+    assert exporter.export_transactions() == 1
+    assert store.transaction_totals() == [
+        ("PAYOUT", "NEW", 10.0),
+        ("PAYOUT", "OK", 10.0),
+        ("PAYOUT", "REJECTED", 10.0),
+    ]
+
+
+def test_ignored_artist_filter_is_reported(tmp_path: Path) -> None:
+    store = StatsStore(tmp_path / "stats.sqlite")
+    api = Api()
+    api.filter_works = False
+    result = make_exporter(api, store).export_all(
+        [1, 2], date(2025, 1, 1), date(2025, 1, 31)
+    )
+    assert len(result.errors) == 1 and "id_artist" in result.errors[0]
+    assert api.count("POST", "/statistics") == 2
+    assert store.stream_totals("artist") == []
+    assert store.done("streams", 1) == set()
+    assert store.done("reports", 1) == {"7"}
+
+
+def test_recent_months_are_fetched_again(tmp_path: Path) -> None:
+    store = StatsStore(tmp_path / "stats.sqlite")
+    exporter = make_exporter(Api(), store)
+    today = date.today()
+    start = today - timedelta(days=STREAMS_SETTLE_DAYS + 40)
+    exporter.export_all([1], start, today)
+    settled = {
+        first.strftime("%Y-%m")
+        for first, last in month_ranges(start, today)
+        if last + timedelta(days=STREAMS_SETTLE_DAYS) < today
+    }
+    assert settled and store.done("streams", 1) == settled
+    # A month that ended less than STREAMS_SETTLE_DAYS ago is fetched again
+    recent = today - timedelta(days=STREAMS_SETTLE_DAYS)
+    assert recent.strftime("%Y-%m") not in store.done("streams", 1)
+    assert store.done("reports", 1) == {"7"}
+
+
+def test_failed_jobs_are_reported_and_retried(tmp_path: Path) -> None:
+    api = Api()
+    ok = api.handle
+
+    def failing(method: str, path: str, payload: Dict[str, Any]) -> Any:
+        if path == "/statistics":
+            raise OSError("timeout")
+        return ok(method, path, payload)
+
+    api.client.handler = failing
+    store = StatsStore(tmp_path / "stats.sqlite")
+    result = make_exporter(api, store).export_all(
+        [1], date(2025, 1, 1), date(2025, 1, 31)
+    )
+    assert len(result.errors) == 1 and "timeout" in result.errors[0]
+    assert store.done("streams", 1) == set()
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Set
+
+from src.status_tracker import ReleaseStatusTracker, StatusChange
+from tests.fakes import FakeResponse, FakeSession
+
+
+class Feed:
+    """Serves notifications newest first and release details by id."""
+
+    def __init__(self) -> None:
+        self.notifications: List[Dict[str, Any]] = []
+        self.releases: Dict[int, Dict[str, Any]] = {}
+        self.broken: Set[int] = set()
+        self.session = FakeSession(self.handle)
+
+    @property
+    def paths(self) -> List[str]:
+        return [path for _, path in self.session.calls]
+
+    def notify(self, release_id: int, status: str, title: str = "Song") -> None:
+        note_id = len(self.notifications) + 1
+        self.notifications.insert(
+            0,
+            {
+                "id": note_id,
+                "type": "RELEASE_STATUS_CHANGE",
+                "data": {
+                    "release": {"id": release_id, "title": title, "status": status}
+                },
+            },
+        )
+        self.releases[release_id] = {
+            "releaseId": release_id,
+            "title": title,
+            "status": status,
+        }
+
+    def handle(self, method: str, path: str, params: Dict[str, Any]) -> Any:
+        if path == "/notifications":
+            skip, limit = params["skip"], params["limit"]
+            return {"data": self.notifications[skip : skip + limit]}
+        rid = int(path.rsplit("/", 1)[1])
+        if rid in self.broken:
+            return FakeResponse({}, status_code=502)
+        return self.releases[rid]
+
+
+def make_tracker(feed: Feed, **kwargs: Any) -> ReleaseStatusTracker:
+    tracker = ReleaseStatusTracker(
+        feed.session, min_interval=10, max_interval=80, page_size=2, **kwargs
+    )
+    tracker.track(
+        [
+            {"releaseId": 1, "title": "One", "status": "MODERATE"},
+            {"releaseId": 2, "title": "Two", "status": "MODERATE"},
+        ]
+    )
+    return tracker
+
+
+def test_first_poll_only_records_the_newest_notification() -> None:
+    feed = Feed()
+    feed.notify(1, "ERROR", "One")
+    feed.notify(2, "WAITING", "Two")
+    tracker = make_tracker(feed)
+    assert tracker.poll() == []
+    assert feed.paths == ["/notifications"]
+    assert tracker.status(1) == "MODERATE" and tracker.status(2) == "MODERATE"
+
+
+def test_poll_fetches_only_changed_releases() -> None:
+    feed = Feed()
+    feed.notify(1, "MODERATE", "One")
+    tracker = make_tracker(feed)
+    tracker.poll()
+
+    feed.notify(2, "WAITING", "Two")
+    feed.notify(99, "RELEASED", "Not tracked")
+    feed.session.calls.clear()
+    changes = tracker.poll()
+    assert [(c.release_id, c.old, c.new) for c in changes] == [
+        (2, "MODERATE", "WAITING")
+    ]
+    assert "/releases/2" in feed.paths
+    assert "/releases/99" not in feed.paths
+    assert tracker.status(2) == "WAITING"
+
+
+def test_poll_reads_only_new_notifications_across_pages() -> None:
+    feed = Feed()
+    feed.notify(1, "MODERATE")
+    tracker = make_tracker(feed)
+    tracker.poll()
+    for status in ("WAITING", "PROCESSED", "RELEASED"):
+        feed.notify(2, status, "Two")
+    feed.session.calls.clear()
+    changes = tracker.poll()
+    assert feed.paths.count("/notifications") == 2
+    # Only the latest status of a release is applied
+    assert [(c.old, c.new) for c in changes] == [("MODERATE", "RELEASED")]
+    feed.session.calls.clear()
+    assert tracker.poll() == []
+    assert feed.paths == ["/notifications"]
+
+
+def test_failed_release_fetch_is_retried() -> None:
+    feed = Feed()
+    tracker = make_tracker(feed)
+    tracker.poll()
+    feed.notify(1, "ERROR", "One")
+    feed.broken.add(1)
+    assert tracker.poll() == []
+    assert tracker.status(1) == "MODERATE"
+    assert tracker.last_error
+
+    feed.broken.clear()
+    (change,) = tracker.poll()
+    assert (change.old, change.new) == ("MODERATE", "ERROR")
+    assert tracker.last_error == ""
+
+
+def test_notification_overflow_rechecks_in_flight_releases() -> None:
+    feed = Feed()
+    tracker = ReleaseStatusTracker(
+        feed.session, min_interval=10, max_interval=80, page_size=2, max_pages=2
+    )
+    tracker.track(
+        [
+            {"releaseId": 1, "title": "One", "status": "MODERATE"},
+            {"releaseId": 2, "title": "Two", "status": "MODERATE"},
+            {"releaseId": 3, "title": "Three", "status": "RELEASED"},
+        ]
+    )
+    tracker.poll()
+    feed.releases[2] = {"releaseId": 2, "title": "Two", "status": "MODERATE"}
+    feed.notify(1, "ERROR", "One")
+    for _ in range(10):
+        feed.notify(99, "RELEASED", "Not tracked")
+    feed.session.calls.clear()
+    (change,) = tracker.poll()
+    assert (change.release_id, change.new) == (1, "ERROR")
+    assert "/releases/2" in feed.paths and "/releases/3" not in feed.paths
+    assert "уведомлений" in tracker.last_error
+    # The next poll is back to normal
+    assert tracker.poll() == [] and tracker.last_error == ""
+
+
+def test_error_transition_is_highlighted() -> None:
+    feed = Feed()
+    seen: List[StatusChange] = []
+    tracker = make_tracker(feed, on_change=seen.append)
+    tracker.poll()
+    feed.notify(1, "ERROR", "One")
+    (change,) = tracker.poll()
+    assert change.is_error and seen == [change]
+    assert change.to_dict()[""] == "❗"
+    assert [r["releaseId"] for r in tracker.errors()] == [1]
+    assert tracker.change_count == 1
+
+
+def test_interval_adapts_to_activity() -> None:
+    feed = Feed()
+    tracker = make_tracker(feed)
+    tracker.poll()
+    assert tracker.interval == 20
+    tracker.poll()
+    tracker.poll()
+    assert tracker.interval == 80
+    feed.notify(1, "WAITING")
+    tracker.poll()
+    assert tracker.interval == 10
+
+    for rid in (1, 2):
+        feed.notify(rid, "RELEASED")
+    tracker.poll()
+    assert tracker.in_flight() == []
+    assert tracker.interval == 80
+
+
+def test_request_errors_back_off() -> None:
+    def offline(method: str, path: str, params: Dict[str, Any]) -> Any:
+        raise OSError("offline")
+
+    tracker = make_tracker(Feed())
+    tracker.session = FakeSession(offline)
+    assert tracker.poll() == []
+    assert tracker.last_error == "offline"
+    assert tracker.interval == 20